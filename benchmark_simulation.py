@@ -0,0 +1,231 @@
+"""
+Benchmarks for the risk simulator in monte_carlo_risk_simulation.py.
+
+Times the simulation, metrics and density stages separately across iteration
+counts, sweeps the density estimate's resolution (number of x points), then
+load-tests the /simulate endpoint with concurrent local clients.
+Results are written as JSON so runs from different releases can be diffed:
+
+    python benchmark_simulation.py --output bench.json
+    python benchmark_simulation.py --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from werkzeug.serving import make_server
+
+import monte_carlo_risk_simulation
+from monte_carlo_risk_simulation import (
+    DENSITY_POINTS,
+    SimulationCache,
+    app,
+    calculate_metrics,
+    generate_density_data,
+    run_monte_carlo_simulation,
+)
+
+DEFAULT_PARAMS = {
+    "jurisdiction": 70,
+    "causation": 45,
+    "evidence": 60,
+    "precedent": 55,
+    "damages": 75,
+    "tribunal_stance": "Neutral",
+}
+DEFAULT_ITERATION_COUNTS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_DENSITY_POINTS = sorted({50, DENSITY_POINTS, 1_000, 5_000})
+# Sample count for the resolution sweep, small enough for exact KDE
+DENSITY_SWEEP_ITERATIONS = 20_000
+# Exact gaussian_kde is O(n * points); beyond this it dominates the whole run
+KDE_MAX_SAMPLES = 100_000
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "repeat": repeat,
+    }
+
+
+def benchmark_stages(iteration_counts, repeat, density_methods):
+    """Time each pipeline stage on its own for every iteration count."""
+    stages = []
+    for iterations in iteration_counts:
+        results, simulation = time_call(
+            lambda: run_monte_carlo_simulation(**DEFAULT_PARAMS, iterations=iterations, seed=0),
+            repeat,
+        )
+        _, metrics = time_call(lambda: calculate_metrics(results), repeat)
+        row = {
+            "iterations": iterations,
+            "run_monte_carlo_simulation": simulation,
+            "calculate_metrics": metrics,
+        }
+        for method in density_methods:
+            key = f"generate_density_data[{method}]"
+            if method == "kde" and iterations > KDE_MAX_SAMPLES:
+                row[key] = {"skipped": f"more than {KDE_MAX_SAMPLES} samples"}
+                continue
+            _, row[key] = time_call(lambda: generate_density_data(results, method=method), repeat)
+        print(f"stages: {iterations:>10,} iterations done")
+        stages.append(row)
+    return stages
+
+
+def benchmark_density_points(points_list, iterations, repeat, density_methods):
+    """Time generate_density_data at each resolution for a fixed sample."""
+    results = run_monte_carlo_simulation(**DEFAULT_PARAMS, iterations=iterations, seed=0)
+    rows = []
+    for points in points_list:
+        row = {"points": points, "iterations": iterations}
+        for method in density_methods:
+            _, row[f"generate_density_data[{method}]"] = time_call(
+                lambda: generate_density_data(results, method=method, points=points), repeat
+            )
+        print(f"density: {points:>10,} points done")
+        rows.append(row)
+    return rows
+
+
+def load_test(clients, requests_per_client, iterations):
+    """Hit /simulate from concurrent local clients against a threaded server."""
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/simulate"
+    # A private in-memory cache, so the run neither sees nor evicts the real (possibly on-disk) one
+    production_cache = monte_carlo_risk_simulation.simulation_cache
+    monte_carlo_risk_simulation.simulation_cache = SimulationCache()
+
+    def client(client_id):
+        latencies = []
+        for i in range(requests_per_client):
+            # Distinct seeds so every request misses the result cache
+            payload = {**DEFAULT_PARAMS, "iterations": iterations, "seed": client_id * requests_per_client + i}
+            request = urllib.request.Request(
+                url,
+                data=json.dumps(payload).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            start = time.perf_counter()
+            with urllib.request.urlopen(request) as response:
+                response.read()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            latencies = [t for result in pool.map(client, range(clients)) for t in result]
+        wall = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        monte_carlo_risk_simulation.simulation_cache = production_cache
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "iterations": iterations,
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall,
+        "latency_p50_s": float(np.percentile(latencies, 50)),
+        "latency_p95_s": float(np.percentile(latencies, 95)),
+        "latency_max_s": max(latencies),
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _compare_rows(current_rows, baseline_rows, key):
+    """Print per-stage median ratios (current / baseline) for rows matching on key."""
+    baseline_rows = {row[key]: row for row in baseline_rows}
+    for row in current_rows:
+        old = baseline_rows.get(row[key])
+        if old is None:
+            continue
+        for stage, timing in row.items():
+            if not isinstance(timing, dict) or "median_s" not in timing or "median_s" not in old.get(stage, {}):
+                continue
+            ratio = timing["median_s"] / old[stage]["median_s"]
+            print(f"{key}={row[key]:>10,} {stage:<40} {ratio:6.2f}x")
+
+
+def compare(current, baseline_path):
+    """Print per-stage median ratios (current / baseline) for matching rows."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    _compare_rows(current["stages"], baseline.get("stages", []), "iterations")
+    _compare_rows(current.get("density_points", []), baseline.get("density_points", []), "points")
+    for new, old in zip(current.get("load_tests", []), baseline.get("load_tests", [])):
+        ratio = new["latency_p95_s"] / old["latency_p95_s"]
+        print(f"load test clients={new['clients']:<3} p95 latency {ratio:6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, nargs="+", default=DEFAULT_ITERATION_COUNTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--density-methods", nargs="+", default=["kde", "histogram"])
+    parser.add_argument("--density-points", type=int, nargs="+", default=DEFAULT_DENSITY_POINTS)
+    parser.add_argument("--density-iterations", type=int, default=DENSITY_SWEEP_ITERATIONS)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--load-iterations", type=int, default=5000)
+    parser.add_argument("--skip-load-test", action="store_true")
+    parser.add_argument("--output", default="bench_simulation.json")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "environment": environment(),
+        "stages": benchmark_stages(args.iterations, args.repeat, args.density_methods),
+        "density_points": benchmark_density_points(
+            args.density_points, args.density_iterations, args.repeat, args.density_methods
+        ),
+        "load_tests": [],
+    }
+    if not args.skip_load_test:
+        for clients in args.clients:
+            report["load_tests"].append(load_test(clients, args.requests_per_client, args.load_iterations))
+            print(f"load test: {clients} clients done")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(report, args.compare)
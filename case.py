@@ -1,16 +1,72 @@
 import dataclasses
 import json
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 import glob
+from case_store import CASE_COLUMNS, LIST_COLUMNS, LazyContent, get_case_store
 
 CASES_DIR = "data/jus_mundi_hackathon_data/cases/"
+CASE_CACHE_MAX_BYTES = int(os.environ.get("CASE_CACHE_MAX_BYTES", 256 << 20))
+# First read when scanning a case file for its metadata; doubled as needed
+METADATA_READ_BYTES = 1 << 16
+# Rough fixed cost of a Case/Decision/Opinion object on top of its text
+OBJECT_OVERHEAD_BYTES = 512
+
+
+class _LazyText:
+    """Data descriptor for `content`: a LazyContent reference stored on the
+    instance is resolved to its text on first read and then kept."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__.get(self.name)
+        if isinstance(value, LazyContent):
+            value = value.resolve()
+            instance.__dict__[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+def _lazy_content(cls):
+    cls.content = _LazyText("content")
+    return cls
+
+
+class _ResolvesOnSerialize:
+    # copy/deepcopy, pickle and yaml.dump all go through __getstate__, so they
+    # see the text rather than a reference into the memory-mapped store.
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["content"] = self.content
+        return state
+
+    def read_content(self) -> str:
+        """The body, without keeping a lazily loaded one on the instance.
+
+        Safe on objects shared between threads; `content` itself memoizes.
+        """
+        value = self.__dict__.get("content")
+        return value.resolve() if isinstance(value, LazyContent) else value
+
+    def read_prefix(self, max_chars: int) -> str:
+        """The first max_chars characters of the body, reading no more than needed."""
+        value = self.__dict__.get("content")
+        return value.prefix(max_chars) if isinstance(value, LazyContent) else (value or "")[:max_chars]
 
 
 # --- Data Loading Classes (as provided) ---
+@_lazy_content
 @dataclasses.dataclass
-class Opinion:
+class Opinion(_ResolvesOnSerialize):
     title: str
     type: str
     date: Optional[datetime]
@@ -27,8 +83,9 @@ class Opinion:
         )
 
 
+@_lazy_content
 @dataclasses.dataclass
-class Decision:
+class Decision(_ResolvesOnSerialize):
     title: str
     type: str
     date: Optional[datetime]
@@ -76,9 +133,18 @@ class Case:
         )
 
 
-def load_case_json(case_id: str) -> Optional[Case]:
-    """Loads a single case JSON file into a Case object."""
+def load_case_json(case_id: str, lazy: bool = False) -> Optional[Case]:
+    """Loads a single case into a Case object.
+
+    Served from the compiled case store (see case_store.py) when it has an
+    up-to-date copy of the case, otherwise parsed from the source JSON file.
+    With lazy=True and a store available, decision and opinion `content` is
+    only read from the store on first access.
+    """
     file_path = os.path.join(CASES_DIR, f"{case_id}.json")
+    store = get_case_store()
+    if store is not None and store.is_fresh(case_id, file_path):
+        return Case.from_dict(store.record(case_id, lazy=lazy))
     if not os.path.exists(file_path):
         return None
     with open(file_path, "r") as f:
@@ -86,6 +152,182 @@ def load_case_json(case_id: str) -> Optional[Case]:
     return Case.from_dict(data)
 
 
+def _read_json_members(file_path: str, keys) -> Dict[str, Any]:
+    """
+    The given top-level members of a JSON object file. Members are decoded in
+    file order and reading stops once every key has been seen, so bodies
+    stored after the metadata (as in the case exports) are never parsed.
+    """
+    decoder = json.JSONDecoder()
+    wanted = set(keys)
+    found: Dict[str, Any] = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = ""
+
+        def read_more() -> bool:
+            nonlocal buffer
+            more = f.read(max(METADATA_READ_BYTES, len(buffer)))
+            buffer += more
+            return bool(more)
+
+        def skip_whitespace(position: int) -> int:
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer):
+                    return position
+                if not read_more():
+                    raise ValueError(f"Truncated JSON in {file_path}")
+
+        def expect(position: int, chars: str) -> tuple:
+            position = skip_whitespace(position)
+            if buffer[position] not in chars:
+                raise ValueError(f"Malformed JSON in {file_path} at offset {position}")
+            return buffer[position], position + 1
+
+        def decode(position: int) -> tuple:
+            position = skip_whitespace(position)
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A value running to the end of the buffer may be cut short (e.g. a number)
+                    if end < len(buffer):
+                        return value, end
+                except json.JSONDecodeError:
+                    pass
+                if not read_more():
+                    return decoder.raw_decode(buffer, position)
+
+        _, position = expect(0, "{")
+        char, position = expect(position, '"}')
+        while char == '"':
+            key, position = decode(position - 1)
+            _, position = expect(position, ":")
+            value, position = decode(position)
+            if key in wanted:
+                found[key] = value
+                if len(found) == len(wanted):
+                    break
+            char, position = expect(position, ",}")
+            if char == ",":
+                char, position = expect(position, '"')
+    return found
+
+
+def load_case_metadata(case_id: str) -> Optional[Dict[str, Any]]:
+    """Case-level fields only, keyed like the source JSON (see CaseStore.metadata).
+
+    Served from the case store when it is up to date; otherwise only the
+    metadata members of the source file are decoded, not its decisions.
+    """
+    file_path = os.path.join(CASES_DIR, f"{case_id}.json")
+    store = get_case_store()
+    if store is not None and store.is_fresh(case_id, file_path):
+        return store.metadata(case_id)
+    if not os.path.exists(file_path):
+        return None
+    data = _read_json_members(file_path, CASE_COLUMNS.values())
+    # Same defaults as build_case_store
+    return {key: data.get(key, [] if column in LIST_COLUMNS else None) for column, key in CASE_COLUMNS.items()}
+
+
+def _case_version(case_id: str) -> tuple:
+    """Changes whenever load_case_json could return something different."""
+    try:
+        stat = os.stat(os.path.join(CASES_DIR, f"{case_id}.json"))
+        source = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        source = None
+    store = get_case_store()
+    return source, store.index_mtime_ns if store is not None else None
+
+
+def case_size(case: Case) -> int:
+    """Approximate resident size: body text held in memory plus a fixed cost
+    per object. Bodies still in the case store cost nothing."""
+    size = OBJECT_OVERHEAD_BYTES
+    for decision in case.decisions:
+        for item in [decision, *decision.opinions]:
+            content = item.__dict__.get("content")
+            size += OBJECT_OVERHEAD_BYTES + (0 if isinstance(content, LazyContent) else len(content or ""))
+    return size
+
+
+class CaseCache:
+    """
+    LRU of parsed Case objects, bounded by case_size rather than count.
+    An entry is dropped when the case's source file or the case store
+    changes. Cached cases are shared: callers must treat them as read-only
+    and read bodies with read_content(), which does not grow them.
+    """
+
+    def __init__(self, max_bytes: int = CASE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, case_id: str, lazy: bool = True) -> Optional[Case]:
+        key = (case_id, lazy)
+        version = _case_version(case_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Parse outside the lock; a concurrent miss on the same case just loads it twice
+        case = load_case_json(case_id=case_id, lazy=lazy)
+        if case is None:
+            return None
+        size = case_size(case)
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (version, case, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return case
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+case_cache = CaseCache()
+
+
+def get_case(case_id: str, lazy: bool = True) -> Optional[Case]:
+    """Shared, read-only Case from the process-wide cache. Use
+    load_case_json for a private copy that may be modified."""
+    return case_cache.get(case_id, lazy=lazy)
+
+
 def list_cases() -> list[str]:
     json_files = glob.glob(os.path.join(CASES_DIR, "*.json"))
     if not json_files:
@@ -0,0 +1,128 @@
+import csv
+import os
+from typing import Dict, Iterable, List, Optional, Union
+
+from case import load_case_metadata
+from case_store import get_case_store
+
+CASES_CSV_PATH = "cases.csv"
+FACETS = ("status", "industry", "nationality", "institution", "rules", "treaty")
+# Facets that come from Case fields rather than cases.csv, keyed like the store
+STORE_FACETS = {
+    "industry": "Industries",
+    "nationality": "PartyNationalities",
+    "institution": "Institution",
+    "rules": "RulesOfArbitration",
+    "treaty": "ApplicableTreaties",
+}
+
+
+def value_matches(wanted: str, value) -> bool:
+    """
+    Filter semantics shared with the full-text search filters (see
+    fulltext_index.py): the whole value must match, ignoring case and
+    surrounding whitespace, so "Oman" does not select "Romania". A trailing
+    "*" matches by prefix instead, e.g. "Decided*" for every decided status.
+    """
+    wanted = wanted.strip().lower()
+    value = str(value).strip().lower()
+    if wanted.endswith("*"):
+        return value.startswith(wanted[:-1])
+    return value == wanted
+
+
+def _iter_bits(bits: int) -> Iterable[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class FacetIndex:
+    """
+    In-memory faceted index over the case catalogue. Every facet value maps
+    to a bitset (a Python int, bit i = case row i), so filters are AND/OR of
+    ints and facet counts are popcounts.
+    """
+
+    def __init__(self, case_ids: List[str], facets: Dict[str, Dict[str, int]]):
+        self.case_ids = case_ids
+        self.rows = {case_id: row for row, case_id in enumerate(case_ids)}
+        self.facets = facets
+        self.all = (1 << len(case_ids)) - 1
+
+    @classmethod
+    def build(cls, cases_csv_path: str = CASES_CSV_PATH) -> "FacetIndex":
+        case_ids = []
+        facets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+
+        def add(facet: str, values, row: int):
+            for value in values if isinstance(values, list) else [values]:
+                if value:
+                    facets[facet][value] = facets[facet].get(value, 0) | (1 << row)
+
+        with open(cases_csv_path, "r", newline="", encoding="utf-8") as f:
+            for row, record in enumerate(csv.DictReader(f)):
+                case_id = record["case_id"]
+                case_ids.append(case_id)
+                add("status", record["status"], row)
+                # From the store, or just the metadata members of the case file
+                metadata = load_case_metadata(case_id)
+                if metadata is not None:
+                    for facet, key in STORE_FACETS.items():
+                        add(facet, metadata[key], row)
+                else:
+                    # No case file either: cases.csv joins lists with ", ",
+                    # which is lossy for values containing commas
+                    add("industry", record["industries"].split(", "), row)
+                    add("nationality", record["nationalities"].split(", "), row)
+        return cls(case_ids, facets)
+
+    def matching(self, facet: str, value: Union[str, List[str]]) -> int:
+        """Bitset of cases whose facet has any of the given values (see value_matches)."""
+        if facet not in self.facets:
+            raise ValueError(f"Unknown facet: {facet}")
+        wanted = value if isinstance(value, list) else [value]
+        bits = 0
+        for facet_value, value_bits in self.facets[facet].items():
+            if any(value_matches(w, facet_value) for w in wanted):
+                bits |= value_bits
+        return bits
+
+    def select(self, **criteria: Union[str, List[str], None]) -> int:
+        """AND across facets, OR within a facet's list of values."""
+        bits = self.all
+        for facet, value in criteria.items():
+            if value:
+                bits &= self.matching(facet, value)
+        return bits
+
+    def filter(self, **criteria: Union[str, List[str], None]) -> List[str]:
+        return [self.case_ids[row] for row in _iter_bits(self.select(**criteria))]
+
+    def counts(self, facet: str, selection: Optional[int] = None) -> Dict[str, int]:
+        """Facet value -> number of cases within `selection` (default: all)."""
+        selection = self.all if selection is None else selection
+        counts = {value: (bits & selection).bit_count() for value, bits in self.facets[facet].items()}
+        return dict(sorted(((v, c) for v, c in counts.items() if c), key=lambda item: -item[1]))
+
+
+_facet_index: Optional[FacetIndex] = None
+_facet_key = None
+
+
+def get_facet_index(cases_csv_path: str = CASES_CSV_PATH) -> FacetIndex:
+    """Returns the process-wide index, rebuilt when cases.csv or the case store changes."""
+    global _facet_index, _facet_key
+    store = get_case_store()
+    key = (cases_csv_path, os.stat(cases_csv_path).st_mtime_ns, store.index_mtime_ns if store else None)
+    if _facet_index is None or _facet_key != key:
+        _facet_index = FacetIndex.build(cases_csv_path)
+        _facet_key = key
+    return _facet_index
+
+
+if __name__ == "__main__":
+    index = get_facet_index()
+    for facet in FACETS:
+        print(facet, list(index.counts(facet).items())[:10])
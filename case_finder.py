@@ -1,32 +1,105 @@
 from case import SAMPLE_USER_QUERY
+from case_facets import get_facet_index
 from llm import call_llm_json, MODEL
-import pandas as pd
+import csv
+import os
+import threading
 
 
 CASES_CSV_PATH = "cases.csv"
+# Cases pre-selected by the local index and shown to the LLM re-ranker
+RETRIEVAL_CANDIDATES = 40
+
+
+class CaseCatalogue:
+    """
+    Prompt lines for every case in cases.csv, built on first use and rebuilt
+    only when the file changes on disk. Parsed with the csv module, so
+    importing this module never pays for pandas.
+    """
+
+    def __init__(self, path: str = CASES_CSV_PATH):
+        self.path = path
+        self._key = None
+        self._lines: dict[str, str] = {}
+        self._prompt = ""
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._key:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            try:
+                with open(self.path, "r", newline="", encoding="utf-8") as f:
+                    # Prepare a string representation of the cases for the prompt
+                    # This includes ID, Title, and Industries for the LLM to analyze
+                    lines = {
+                        row["case_id"]: f"- Case ID: {row['case_id']}, Status: {row['status']}, Title: {row['title']}, Industries: {row['industries']}, Nationalities: {row['nationalities']}"
+                        for row in csv.DictReader(f)
+                    }
+            except Exception as e:
+                print(f"An error occurred while reading the {self.path} file: {e}")
+                raise
+            print(f"Loaded {len(lines)} cases from {self.path}")
+            self._lines = lines
+            self._prompt = "\n".join(lines.values())
+            self._key = key
+
+    def lines(self) -> dict[str, str]:
+        self._refresh()
+        return self._lines
+
+    def prompt(self) -> str:
+        self._refresh()
+        return self._prompt
+
+
+catalogue = CaseCatalogue()
 
 
 def load_cases_prompt() -> str:
-    try:
-        df_cases = pd.read_csv(CASES_CSV_PATH)
-        print(f"Loaded {len(df_cases)} cases from {CASES_CSV_PATH}")
-        # Prepare a string representation of the cases for the prompt
-        # This includes ID, Title, and Industries for the LLM to analyze
-        return "\n".join(
-            [
-                f"- Case ID: {row['case_id']}, Status: {row['status']}, Title: {row['title']}, Industries: {row['industries']}, Nationalities: {row['nationalities']}"
-                for _, row in df_cases.iterrows()
-            ]
-        )
-    except Exception as e:
-        print(f"An error occurred while reading the {CASES_CSV_PATH} file: {e}")
-        raise
-
-
-cases_prompt = load_cases_prompt()
-
-
-def find_cases(user_query: str, top_n: int) -> list[str]:
+    return catalogue.prompt()
+
+
+def candidate_cases_prompt(user_query: str, candidates: int = RETRIEVAL_CANDIDATES, filters: dict | None = None) -> str:
+    """
+    Catalogue lines for the top candidates from the local retrieval index,
+    so the prompt size stays constant as the corpus grows. Falls back to the
+    whole catalogue when no index has been built (see case_index.py). Cases
+    added to the catalogue since the index was built are always included.
+
+    `filters` prunes the catalogue by facet first (see case_facets.py), e.g.
+    {"industry": "Mining", "status": "Decided*"}.
+    """
+    # Deferred: numpy/scipy are only needed once a query actually runs
+    from case_index import get_case_index
+
+    case_ids = None
+    if filters:
+        case_ids = get_facet_index(catalogue.path).filter(**filters)
+        print(f"Facet filters {filters} kept {len(case_ids)} cases")
+    index = get_case_index()
+    if index is not None and candidates:
+        # The index cannot rank cases it has never seen, so they must not be hidden
+        pool = catalogue.lines() if case_ids is None else case_ids
+        unindexed = [case_id for case_id in pool if case_id not in index]
+        if unindexed:
+            print(f"{len(unindexed)} cases are not in the case index yet; run case_index.py to rank them")
+        ranked = index.search(user_query, top_k=candidates, case_ids=case_ids)
+        case_ids = [case_id for case_id, _ in ranked] + unindexed
+    if case_ids is None:
+        return catalogue.prompt()
+    case_lines = catalogue.lines()
+    return "\n".join(case_lines[case_id] for case_id in case_ids if case_id in case_lines)
+
+
+def find_cases(
+    user_query: str, top_n: int, candidates: int = RETRIEVAL_CANDIDATES, filters: dict | None = None
+) -> list[str]:
     prompt = f"""\
 Given USER_QUERY and CASES respond with a list of top {top_n} cases relevant to the USER_QUERY which should be read in detail.
 
@@ -40,7 +113,7 @@ Based on previous case law opposing this strategy, if there are at least 1, it s
 
 <USER_QUERY>{user_query}</USER_QUERY>
 <CASES>
-{cases_prompt}
+{candidate_cases_prompt(user_query, candidates, filters)}
 </CASES>
 
 OUTPUT:
@@ -0,0 +1,172 @@
+import csv
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from case_store import get_case_store
+from text_tokens import tokenize
+
+CASES_CSV_PATH = "cases.csv"
+CASE_INDEX_PATH = "data/case_index.npz"
+EMBEDDING_MODEL = os.environ.get("CASE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# Characters of each decision's opening text folded into the case document
+DECISION_EXCERPT_CHARS = 2000
+
+
+def case_documents(cases_csv_path: str = CASES_CSV_PATH) -> Dict[str, str]:
+    """
+    One retrieval document per case: the cases.csv catalogue fields, plus
+    decision titles/types and an opening excerpt of each decision when the
+    compiled case store is available.
+    """
+    store = get_case_store()
+    documents = {}
+    with open(cases_csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            parts = [row["title"], row["status"], row["industries"], row["nationalities"]]
+            if store is not None and row["case_id"] in store:
+                case = store.record(row["case_id"], lazy=True)
+                parts.append(case["Institution"])
+                for decision in case["Decisions"]:
+                    parts += [decision["Title"], decision["Type"], decision["Content"].prefix(DECISION_EXCERPT_CHARS)]
+            documents[row["case_id"]] = "\n".join(p for p in parts if p)
+    return documents
+
+
+def _tfidf(documents: List[str]) -> Tuple[sparse.csr_matrix, Dict[str, int], np.ndarray]:
+    vocabulary: Dict[str, int] = {}
+    rows, cols, values = [], [], []
+    for i, document in enumerate(documents):
+        for term, count in Counter(tokenize(document)).items():
+            rows.append(i)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(1.0 + math.log(count))
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(len(documents), len(vocabulary)), dtype=np.float32)
+    df = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+    matrix = sparse.csr_matrix(matrix.multiply(idf))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sparse.csr_matrix(sparse.diags(1 / np.maximum(norms, 1e-12)) @ matrix, dtype=np.float32)
+    return matrix, vocabulary, idf
+
+
+def _embedding_model():
+    # Optional dependency: pip install sentence-transformers
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def build_case_index(backend: str = "auto", index_path: str = CASE_INDEX_PATH, cases_csv_path: str = CASES_CSV_PATH) -> str:
+    """Builds and saves the retrieval index. Returns the backend used."""
+    documents = case_documents(cases_csv_path)
+    case_ids = list(documents)
+    texts = [documents[case_id] for case_id in case_ids]
+    if backend == "auto":
+        try:
+            model = _embedding_model()
+            backend = "embedding"
+        except ImportError:
+            backend = "tfidf"
+    elif backend == "embedding":
+        model = _embedding_model()
+
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    if backend == "embedding":
+        vectors = model.encode(texts, normalize_embeddings=True, show_progress_bar=True).astype(np.float32)
+        np.savez(index_path, backend=backend, case_ids=np.array(case_ids), vectors=vectors, model=EMBEDDING_MODEL)
+    elif backend == "tfidf":
+        matrix, vocabulary, idf = _tfidf(texts)
+        np.savez(
+            index_path,
+            backend=backend,
+            case_ids=np.array(case_ids),
+            data=matrix.data,
+            indices=matrix.indices,
+            indptr=matrix.indptr,
+            shape=np.array(matrix.shape),
+            vocabulary=np.array(sorted(vocabulary, key=vocabulary.get)),
+            idf=idf,
+        )
+    else:
+        raise ValueError(f"Unknown index backend: {backend}")
+    return backend
+
+
+class CaseIndex:
+    """Brute-force cosine search over the saved case vectors."""
+
+    def __init__(self, index_path: str = CASE_INDEX_PATH):
+        self.index_path = index_path
+        self.mtime_ns = os.stat(index_path).st_mtime_ns
+        with np.load(index_path) as data:
+            self.backend = str(data["backend"])
+            self.case_ids = [str(case_id) for case_id in data["case_ids"]]
+            self.rows = {case_id: row for row, case_id in enumerate(self.case_ids)}
+            if self.backend == "embedding":
+                self.vectors = data["vectors"]
+                self.model = _embedding_model()
+            else:
+                self.vectors = sparse.csr_matrix(
+                    (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"])
+                )
+                self.vocabulary = {term: i for i, term in enumerate(data["vocabulary"].tolist())}
+                self.idf = data["idf"]
+
+    def __contains__(self, case_id: str) -> bool:
+        return case_id in self.rows
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        if self.backend == "embedding":
+            return self.model.encode([query], normalize_embeddings=True)[0].astype(np.float32)
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                vector[column] = (1.0 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def search(self, query: str, top_k: int = 40, case_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k (case_id, score) pairs, optionally restricted to case_ids."""
+        scores = np.asarray(self.vectors @ self._query_vector(query)).ravel()
+        if case_ids is not None:
+            allowed = set(case_ids)
+            mask = np.array([case_id in allowed for case_id in self.case_ids], dtype=bool)
+            scores = np.where(mask, scores, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.case_ids[i], float(scores[i])) for i in best]
+
+
+_index: Optional[CaseIndex] = None
+
+
+def get_case_index(index_path: str = CASE_INDEX_PATH) -> Optional[CaseIndex]:
+    """Returns the process-wide index, reloading it after a rebuild. None if not built."""
+    global _index
+    try:
+        mtime_ns = os.stat(index_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _index is None or _index.index_path != index_path or _index.mtime_ns != mtime_ns:
+        _index = CaseIndex(index_path)
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["auto", "embedding", "tfidf"], default="auto")
+    args = parser.parse_args()
+    backend = build_case_index(backend=args.backend)
+    print(f"Built {backend} case index at {CASE_INDEX_PATH}")
@@ -0,0 +1,265 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+from typing import Any, Dict, List, Optional
+
+CASE_STORE_DIR = "data/case_store/"
+INDEX_FILE = "index.json"
+# Each build writes its bodies to a new blob named after its hash; the index
+# names the blob it belongs to, so swapping in the index switches both at once
+CONTENT_FILE_PATTERN = "content-{}.bin"
+STORE_VERSION = 3
+
+CASE_COLUMNS = {
+    # column name -> key in the source case JSON
+    "identifier": "Identifier",
+    "title": "Title",
+    "case_number": "CaseNumber",
+    "industries": "Industries",
+    "status": "Status",
+    "party_nationalities": "PartyNationalities",
+    "institution": "Institution",
+    "rules_of_arbitration": "RulesOfArbitration",
+    "applicable_treaties": "ApplicableTreaties",
+}
+LIST_COLUMNS = {"industries", "party_nationalities", "rules_of_arbitration", "applicable_treaties"}
+
+
+class LazyContent:
+    """Reference to a decision/opinion body in the store, read on demand."""
+
+    __slots__ = ("store", "offset", "length")
+
+    def __init__(self, store: "CaseStore", offset: int, length: int):
+        self.store = store
+        self.offset = offset
+        self.length = length
+
+    def resolve(self) -> str:
+        return self.store.content(self.offset, self.length)
+
+    def prefix(self, max_chars: int) -> str:
+        """The first max_chars characters, reading no more than needed."""
+        data = self.store.content_bytes(self.offset, min(self.length, max_chars * 4))
+        return data.decode("utf-8", "ignore")[:max_chars]
+
+    def __len__(self) -> int:
+        # Encoded size in bytes; lets callers budget without loading the body
+        return self.length
+
+
+def _empty_columns(*names: str) -> Dict[str, list]:
+    return {name: [] for name in names}
+
+
+def build_case_store(cases_dir: str, store_dir: str = CASE_STORE_DIR) -> int:
+    """
+    Packs every case JSON in cases_dir into a compiled store: a columnar
+    metadata index plus one blob holding all decision/opinion bodies,
+    addressed by (offset, length). Returns the number of cases written.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    cases = _empty_columns("case_id", "source_mtime_ns", "source_size", "decision_start", "decision_count", *CASE_COLUMNS)
+    decisions = _empty_columns(
+        "title", "type", "date", "offset", "length", "sha256", "opinion_start", "opinion_count"
+    )
+    opinions = _empty_columns("title", "type", "date", "offset", "length")
+
+    content_tmp = os.path.join(store_dir, CONTENT_FILE_PATTERN.format("tmp"))
+    content_hash = hashlib.sha256()
+    offset = 0
+    with open(content_tmp, "wb") as blob:
+
+        def write_body(text: Optional[str]) -> tuple:
+            nonlocal offset
+            data = (text or "").encode("utf-8")
+            blob.write(data)
+            content_hash.update(data)
+            offset += len(data)
+            return offset - len(data), len(data), data
+
+        for file_path in sorted(glob.glob(os.path.join(cases_dir, "*.json"))):
+            stat = os.stat(file_path)
+            with open(file_path, "r") as f:
+                data = json.load(f)
+            cases["case_id"].append(os.path.splitext(os.path.basename(file_path))[0])
+            cases["source_mtime_ns"].append(stat.st_mtime_ns)
+            cases["source_size"].append(stat.st_size)
+            for column, key in CASE_COLUMNS.items():
+                cases[column].append(data.get(key, [] if column in LIST_COLUMNS else None))
+            cases["decision_start"].append(len(decisions["title"]))
+            cases["decision_count"].append(len(data.get("Decisions", [])))
+
+            for decision in data.get("Decisions", []):
+                decisions["title"].append(decision["Title"])
+                decisions["type"].append(decision["Type"])
+                decisions["date"].append(decision.get("Date"))
+                decision_offset, decision_length, decision_data = write_body(decision["Content"])
+                decisions["offset"].append(decision_offset)
+                decisions["length"].append(decision_length)
+                # Content address for artifacts derived from the body (see decision_digest.py)
+                decisions["sha256"].append(hashlib.sha256(decision_data).hexdigest())
+                decisions["opinion_start"].append(len(opinions["title"]))
+                decisions["opinion_count"].append(len(decision.get("Opinions", [])))
+                for opinion in decision.get("Opinions", []):
+                    opinions["title"].append(opinion["Title"])
+                    opinions["type"].append(opinion["Type"])
+                    opinions["date"].append(opinion.get("Date"))
+                    opinion_offset, opinion_length, _ = write_body(opinion.get("Content", ""))
+                    opinions["offset"].append(opinion_offset)
+                    opinions["length"].append(opinion_length)
+
+    content_file = CONTENT_FILE_PATTERN.format(content_hash.hexdigest()[:16])
+    previous_blobs = _content_blobs(store_dir)
+    os.replace(content_tmp, os.path.join(store_dir, content_file))
+
+    index_tmp = os.path.join(store_dir, INDEX_FILE + ".tmp")
+    with open(index_tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": STORE_VERSION,
+                "content_file": content_file,
+                "content_size": offset,
+                "cases": cases,
+                "decisions": decisions,
+                "opinions": opinions,
+            },
+            f,
+            separators=(",", ":"),
+        )
+    # Readers that loaded the old index still find its blob: the previous
+    # build's blob is kept, older ones are removed
+    os.replace(index_tmp, os.path.join(store_dir, INDEX_FILE))
+    for path in [p for p in previous_blobs if os.path.basename(p) != content_file][:-1]:
+        os.remove(path)
+    return len(cases["case_id"])
+
+
+def _content_blobs(store_dir: str) -> List[str]:
+    """Finished content blobs in store_dir, oldest first."""
+    tmp_path = os.path.join(store_dir, CONTENT_FILE_PATTERN.format("tmp"))
+    paths = [p for p in glob.glob(os.path.join(store_dir, CONTENT_FILE_PATTERN.format("*"))) if p != tmp_path]
+    return sorted(paths, key=os.path.getmtime)
+
+
+class CaseStore:
+    """Read side of the compiled store. The index is parsed once per process;
+    bodies are sliced out of a memory-mapped blob only when asked for."""
+
+    def __init__(self, store_dir: str = CASE_STORE_DIR):
+        self.store_dir = store_dir
+        index_path = os.path.join(store_dir, INDEX_FILE)
+        self.index_mtime_ns = os.stat(index_path).st_mtime_ns
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported case store version: {index.get('version')}")
+        self.cases = index["cases"]
+        self.decisions = index["decisions"]
+        self.opinions = index["opinions"]
+        self.rows = {case_id: row for row, case_id in enumerate(self.cases["case_id"])}
+
+        content_path = os.path.join(store_dir, index["content_file"])
+        self._content_file = open(content_path, "rb")
+        size = os.fstat(self._content_file.fileno()).st_size
+        if size != index["content_size"]:
+            self._content_file.close()
+            raise ValueError(f"Case store blob {content_path} is {size} bytes, index expects {index['content_size']}")
+        # mmap refuses empty files; a store with no bodies never slices anyway
+        self._content = mmap.mmap(self._content_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def case_ids(self) -> List[str]:
+        return list(self.cases["case_id"])
+
+    def __contains__(self, case_id: str) -> bool:
+        return case_id in self.rows
+
+    def is_fresh(self, case_id: str, source_path: str) -> bool:
+        """True if case_id is stored and its source file has not changed since."""
+        row = self.rows.get(case_id)
+        if row is None:
+            return False
+        try:
+            stat = os.stat(source_path)
+        except FileNotFoundError:
+            # The store is self-contained; a missing export is not a reason to fail
+            return True
+        return stat.st_mtime_ns == self.cases["source_mtime_ns"][row] and stat.st_size == self.cases["source_size"][row]
+
+    def content_bytes(self, offset: int, length: int) -> bytes:
+        return self._content[offset : offset + length]
+
+    def content(self, offset: int, length: int) -> str:
+        return self.content_bytes(offset, length).decode("utf-8")
+
+    def metadata(self, case_id: str) -> Dict[str, Any]:
+        """Case-level fields only, keyed like the source JSON."""
+        row = self.rows[case_id]
+        return {key: self.cases[column][row] for column, key in CASE_COLUMNS.items()}
+
+    def record(self, case_id: str, lazy: bool = False) -> Dict[str, Any]:
+        """The full case in the same shape as the source JSON file.
+
+        With lazy=True every "Content" is a LazyContent reference instead of
+        the decoded text.
+        """
+        row = self.rows[case_id]
+        data = self.metadata(case_id)
+        start = self.cases["decision_start"][row]
+        data["Decisions"] = [
+            self._decision_record(i, lazy) for i in range(start, start + self.cases["decision_count"][row])
+        ]
+        return data
+
+    def decision_hashes(self, case_id: str) -> List[str]:
+        """sha256 of each decision body, in decision order."""
+        row = self.rows[case_id]
+        start = self.cases["decision_start"][row]
+        return self.decisions["sha256"][start : start + self.cases["decision_count"][row]]
+
+    def _body(self, offset: int, length: int, lazy: bool):
+        return LazyContent(self, offset, length) if lazy else self.content(offset, length)
+
+    def _decision_record(self, i: int, lazy: bool) -> Dict[str, Any]:
+        d = self.decisions
+        start = d["opinion_start"][i]
+        return {
+            "Title": d["title"][i],
+            "Type": d["type"][i],
+            "Date": d["date"][i],
+            "Content": self._body(d["offset"][i], d["length"][i], lazy),
+            "Opinions": [self._opinion_record(j, lazy) for j in range(start, start + d["opinion_count"][i])],
+        }
+
+    def _opinion_record(self, j: int, lazy: bool) -> Dict[str, Any]:
+        o = self.opinions
+        return {
+            "Title": o["title"][j],
+            "Type": o["type"][j],
+            "Date": o["date"][j],
+            "Content": self._body(o["offset"][j], o["length"][j], lazy),
+        }
+
+
+_store: Optional[CaseStore] = None
+
+
+def get_case_store(store_dir: str = CASE_STORE_DIR) -> Optional[CaseStore]:
+    """Returns the process-wide store, reopening it after a rebuild. None if not built."""
+    global _store
+    try:
+        index_mtime_ns = os.stat(os.path.join(store_dir, INDEX_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _store is None or _store.store_dir != store_dir or _store.index_mtime_ns != index_mtime_ns:
+        _store = CaseStore(store_dir)
+    return _store
+
+
+if __name__ == "__main__":
+    from case import CASES_DIR
+
+    count = build_case_store(cases_dir=CASES_DIR)
+    print(f"Packed {count} cases into {CASE_STORE_DIR}")
@@ -1,28 +1,153 @@
-from case import load_case_json, SAMPLE_USER_QUERY
+from case import Case, get_case, SAMPLE_USER_QUERY
+from decision_chunks import DECISION_CHUNK_TOKENS, split_chunks
+from decision_digest import case_digests
+from decision_gate import DECISION_GATE_THRESHOLD, gate_decisions
 from llm import call_llm, MODEL, llm_thread_pool
-import copy
+import dataclasses
+import functools
 import yaml
+from datetime import datetime
 from tqdm import tqdm
-from concurrent.futures import as_completed
-
-
-def case_summary(case_id: str, user_query: str):
-    case = load_case_json(case_id=case_id)
-    case_copy = copy.deepcopy(case)
-    for decision in case_copy.decisions:
-        decision.content = None
-        decision.opinions = None
-    case_without_decisions_yaml = yaml.dump(case_copy, sort_keys=False)
-
-    def process_decision(decision):
-        decision_content = decision.content
-        decision.content = None
-        decision.opinions = None
-        prompt = f"""Analyze the full DECISION text provided below. Create a structured summary of the findings on the following topics, but ONLY if they are relevant to the USER_QUERY:
-1.  **Jurisdiction over Counterclaim**: Did the tribunal accept jurisdiction over the state's counterclaim? What was the reasoning (e.g., 'close connection' test)?
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Optional, Tuple
+
+# Chunks of oversized decisions are summarized here rather than on
+# llm_thread_pool, whose workers are the ones waiting for them
+chunk_thread_pool = ThreadPoolExecutor(max_workers=16)
+
+
+SUMMARY_TOPICS = """1.  **Jurisdiction over Counterclaim**: Did the tribunal accept jurisdiction over the state's counterclaim? What was the reasoning (e.g., 'close connection' test)?
 2.  **Merits of Counterclaim - Causation**: What was the tribunal's finding on the causal link between the investor's actions and the alleged damage? What was the standard of proof required? How was evidence like expert reports treated?
 3.  **Merits of Counterclaim - Quantum**: How did the tribunal assess the damages claimed by the state? Did it accept the claimed amount? What methodology did it use? State the amounts claimed vs. awarded if available.
-4.  **Overall Outcome**: Briefly state the final outcome regarding the counterclaim.
+4.  **Overall Outcome**: Briefly state the final outcome regarding the counterclaim."""
+# Answer to a digest prompt when the digest is too coarse for the query
+NEED_FULL_TEXT = "NEED_FULL_TEXT"
+
+
+@dataclasses.dataclass(frozen=True)
+class DecisionMetadata:
+    """A Decision without its body and opinions, as it appears in prompts."""
+
+    title: str
+    type: str
+    date: Optional[datetime]
+
+    @classmethod
+    def from_decision(cls, decision) -> "DecisionMetadata":
+        return cls(title=decision.title, type=decision.type, date=decision.date)
+
+
+@dataclasses.dataclass(frozen=True)
+class CaseMetadata:
+    """A Case reduced to what prompts show of it; hashable, so renderings can be cached."""
+
+    identifier: str
+    title: str
+    case_number: Optional[str]
+    industries: Tuple[str, ...]
+    status: str
+    party_nationalities: Tuple[str, ...]
+    institution: str
+    rules_of_arbitration: Tuple[str, ...]
+    applicable_treaties: Tuple[str, ...]
+    decisions: Tuple[DecisionMetadata, ...]
+
+    @classmethod
+    def from_case(cls, case) -> "CaseMetadata":
+        return cls(
+            identifier=case.identifier,
+            title=case.title,
+            case_number=case.case_number,
+            industries=tuple(case.industries),
+            status=case.status,
+            party_nationalities=tuple(case.party_nationalities),
+            institution=case.institution,
+            rules_of_arbitration=tuple(case.rules_of_arbitration),
+            applicable_treaties=tuple(case.applicable_treaties),
+            decisions=tuple(DecisionMetadata.from_decision(d) for d in case.decisions),
+        )
+
+
+class _PromptDumper(yaml.SafeDumper):
+    # Not CSafeDumper: libyaml folds and escapes long or non-ASCII scalars
+    # differently from PyYAML, which would change the prompt text
+    pass
+
+
+# Both representers reproduce yaml.dump of the full objects with content and
+# opinions cleared, tags and key order included, so prompts are unchanged
+def _represent_decision(dumper, decision: DecisionMetadata):
+    return dumper.represent_mapping(
+        "tag:yaml.org,2002:python/object:case.Decision",
+        {"title": decision.title, "type": decision.type, "date": decision.date, "opinions": None, "content": None},
+    )
+
+
+def _represent_case(dumper, case: CaseMetadata):
+    fields = {field.name: getattr(case, field.name) for field in dataclasses.fields(case)}
+    return dumper.represent_mapping(
+        "tag:yaml.org,2002:python/object:case.Case",
+        {name: list(value) if isinstance(value, tuple) else value for name, value in fields.items()},
+    )
+
+
+_PromptDumper.add_representer(DecisionMetadata, _represent_decision)
+_PromptDumper.add_representer(CaseMetadata, _represent_case)
+
+
+@functools.lru_cache(maxsize=1024)
+def case_yaml(case: CaseMetadata) -> str:
+    return yaml.dump(case, Dumper=_PromptDumper, sort_keys=False)
+
+
+@functools.lru_cache(maxsize=8192)
+def decision_yaml(decision: DecisionMetadata) -> str:
+    return yaml.dump(decision, Dumper=_PromptDumper)
+
+
+@dataclasses.dataclass(frozen=True)
+class DecisionSummary:
+    index: int  # position of the decision in case.decisions
+    summary: str
+    source: str  # "digest", "full_text", "chunks" or "gated" (skipped by the relevance gate)
+    relevance: Optional[float] = None  # relevance gate score, when gating was on
+
+
+def gate_report(summaries: Iterable[DecisionSummary], threshold: Optional[float] = DECISION_GATE_THRESHOLD) -> str:
+    summaries = list(summaries)
+    skipped = sum(summary.source == "gated" for summary in summaries)
+    return f"Relevance gate (threshold {threshold}): skipped {skipped} of {len(summaries)} decisions"
+
+
+def decision_tasks(
+    case_id: str,
+    user_query: str,
+    use_digests: bool = True,
+    drill_down: bool = True,
+    case: Optional[Case] = None,
+    gate_threshold: Optional[float] = DECISION_GATE_THRESHOLD,
+):
+    """
+    Returns (case, tasks): one callable per decision that summarizes it
+    against user_query and returns a DecisionSummary. Decisions scoring
+    below gate_threshold on a cheap lexical relevance check (see
+    decision_gate.py) are not sent to the model; gate_threshold=None sends
+    every decision. Decisions with a precomputed digest (see
+    decision_digest.py) are summarized from the digest; with drill_down,
+    the full text is read only when the model answers NEED_FULL_TEXT. Run
+    the tasks on any executor, then pass their results to
+    format_case_summary.
+
+    The case comes from the shared case cache unless given, and is never
+    modified, so one Case can serve any number of concurrent summaries.
+    """
+    case = case or get_case(case_id)
+    digests = case_digests(case_id, case) if use_digests else [None] * len(case.decisions)
+    case_without_decisions_yaml = case_yaml(CaseMetadata.from_case(case))
+
+    def full_text_prompt(decision, decision_content):
+        return f"""Analyze the full DECISION text provided below. Create a structured summary of the findings on the following topics, but ONLY if they are relevant to the USER_QUERY:
+{SUMMARY_TOPICS}
 
 If DECISION_CONTENT is not relevant to USER_QUERY respond with NOT_RELEVANT.
 
@@ -31,7 +156,7 @@ If DECISION_CONTENT is not relevant to USER_QUERY respond with NOT_RELEVANT.
 {case_without_decisions_yaml}
 </CASE>
 <DECISION>
-{yaml.dump(decision)}
+{decision_yaml(decision)}
 </DECISION>
 <DECISION_CONTENT>
 {decision_content}
@@ -39,23 +164,119 @@ If DECISION_CONTENT is not relevant to USER_QUERY respond with NOT_RELEVANT.
 
 REMEMBER: do NOT include introductory sentences such as "Here is the summary:"
 """
-        response = call_llm(prompt=prompt, model=MODEL.GEMINI_FLASH_LIGHT)
-        decision.content = response
-        return decision
-
-    with tqdm(total=len(case.decisions), desc=f"Reading case_id={case_id}") as pbar:
-        futures = [
-            llm_thread_pool.submit(process_decision, decision)
-            for decision in case.decisions
-        ]
-        for future in as_completed(futures):
-            pbar.update(1)
 
-    # Remove NOT_RELEVANT decisions.
-    case.decisions = [
-        d
-        for d in case.decisions
-        if d.content is None or "NOT_RELEVANT" not in str(d.content)
+    def chunk_prompt(decision, chunk):
+        return f"""Analyze the EXCERPT of a DECISION provided below; it is one consecutive part of a decision too long to read at once. Extract the findings in this excerpt on the following topics, but ONLY if they are relevant to the USER_QUERY. Quote amounts, tests and paragraph numbers exactly, as the notes will be merged with those from the other parts:
+{SUMMARY_TOPICS}
+
+If EXCERPT is not relevant to USER_QUERY respond with NOT_RELEVANT.
+
+<USER_QUERY>{user_query}</USER_QUERY>
+<CASE>
+{case_without_decisions_yaml}
+</CASE>
+<DECISION>
+{decision_yaml(decision)}
+</DECISION>
+<EXCERPT>
+{chunk}
+</EXCERPT>
+
+REMEMBER: do NOT include introductory sentences such as "Here is the summary:"
+"""
+
+    def merge_prompt(decision, partials):
+        parts = "\n".join(f"<PART>\n{partial}\n</PART>" for partial in partials)
+        return f"""The PARTs below are notes taken, in order, from consecutive excerpts of one DECISION. Merge them into a single structured summary of the findings on the following topics, but ONLY if they are relevant to the USER_QUERY. Resolve repetitions, keep every amount and paragraph reference, and prefer later parts where the tribunal's final position differs from earlier discussion:
+{SUMMARY_TOPICS}
+
+If the PARTs are not relevant to USER_QUERY respond with NOT_RELEVANT.
+
+<USER_QUERY>{user_query}</USER_QUERY>
+<CASE>
+{case_without_decisions_yaml}
+</CASE>
+<DECISION>
+{decision_yaml(decision)}
+</DECISION>
+{parts}
+
+REMEMBER: do NOT include introductory sentences such as "Here is the summary:"
+"""
+
+    def summarize_full_text(decision, decision_content):
+        """Returns (summary, source)."""
+        chunks = split_chunks(decision_content or "", DECISION_CHUNK_TOKENS)
+        if len(chunks) == 1:
+            prompt = full_text_prompt(decision, decision_content)
+            return call_llm(prompt=prompt, model=MODEL.GEMINI_FLASH_LIGHT), "full_text"
+        # Map: every chunk prompt is cached on its own, so an edited decision
+        # only re-reads the chunks that changed
+        partials = chunk_thread_pool.map(
+            lambda chunk: call_llm(prompt=chunk_prompt(decision, chunk), model=MODEL.GEMINI_FLASH_LIGHT), chunks
+        )
+        relevant = [partial for partial in partials if "NOT_RELEVANT" not in partial]
+        if not relevant:
+            return "NOT_RELEVANT", "chunks"
+        # Reduce
+        return call_llm(prompt=merge_prompt(decision, relevant), model=MODEL.GEMINI_FLASH_LIGHT), "chunks"
+
+    def digest_prompt(decision, digest):
+        return f"""Analyze the DIGEST of a decision provided below. It was prepared from the full decision text independently of any question. Create a structured summary of the findings on the following topics, but ONLY if they are relevant to the USER_QUERY:
+{SUMMARY_TOPICS}
+
+If DIGEST is not relevant to USER_QUERY respond with NOT_RELEVANT.
+If DIGEST is relevant to USER_QUERY but too coarse to answer it, respond with only {NEED_FULL_TEXT}.
+
+<USER_QUERY>{user_query}</USER_QUERY>
+<CASE>
+{case_without_decisions_yaml}
+</CASE>
+<DECISION>
+{decision_yaml(decision)}
+</DECISION>
+<DIGEST>
+{yaml.dump(digest, Dumper=_PromptDumper, sort_keys=False, allow_unicode=True)}
+</DIGEST>
+
+REMEMBER: do NOT include introductory sentences such as "Here is the summary:"
+"""
+
+    def process_decision(index, decision, digest, relevance) -> DecisionSummary:
+        metadata = DecisionMetadata.from_decision(decision)
+        if digest is not None:
+            response = call_llm(prompt=digest_prompt(metadata, digest), model=MODEL.GEMINI_FLASH_LIGHT)
+            if NEED_FULL_TEXT not in response or not drill_down:
+                summary = response.replace(NEED_FULL_TEXT, "").strip() or "NOT_RELEVANT"
+                return DecisionSummary(index, summary, "digest", relevance)
+        # read_content leaves a lazily loaded body in the store rather than on the shared object
+        summary, source = summarize_full_text(metadata, decision.read_content())
+        return DecisionSummary(index, summary, source, relevance)
+
+    def gated_decision(index, relevance) -> DecisionSummary:
+        return DecisionSummary(index, "NOT_RELEVANT", "gated", relevance)
+
+    if gate_threshold is None:
+        scores, keep = [None] * len(case.decisions), [True] * len(case.decisions)
+    else:
+        scores, keep = gate_decisions(user_query, case.decisions, gate_threshold)
+    tasks = [
+        functools.partial(process_decision, index, decision, digest, score)
+        if kept
+        else functools.partial(gated_decision, index, score)
+        for index, (decision, digest, score, kept) in enumerate(zip(case.decisions, digests, scores, keep))
+    ]
+    return case, tasks
+
+
+def format_case_summary(case_id: str, case, summaries: Iterable[DecisionSummary]) -> str:
+    """Renders the case with each decision's summary; decisions with no
+    summary (failed calls) show None, NOT_RELEVANT ones are left out."""
+    by_index = {summary.index: summary.summary for summary in summaries}
+    decisions = [
+        (decision, by_index.get(index))
+        for index, decision in enumerate(case.decisions)
+        if "NOT_RELEVANT" not in str(by_index.get(index))
     ]
     case_str = f"""CASE_ID: {case_id}
 IDENTIFIER: {case.identifier}
@@ -86,9 +307,9 @@ DECISIONS:
   TYPE: {getattr(decision, "type", "")}
   DATE: {getattr(decision, "date", "")}
   CONTENT: |
-{str(decision.content).rstrip()}
+{str(summary).rstrip()}
 '''
-                for decision in getattr(case, "decisions", [])
+                for decision, summary in decisions
             ]
         )
     }
@@ -96,5 +317,27 @@ DECISIONS:
     return case_str
 
 
+def case_summary(
+    case_id: str,
+    user_query: str,
+    use_digests: bool = True,
+    drill_down: bool = True,
+    gate_threshold: Optional[float] = DECISION_GATE_THRESHOLD,
+) -> str:
+    case, tasks = decision_tasks(
+        case_id, user_query, use_digests=use_digests, drill_down=drill_down, gate_threshold=gate_threshold
+    )
+    summaries = []
+    with tqdm(total=len(tasks), desc=f"Reading case_id={case_id}") as pbar:
+        futures = [llm_thread_pool.submit(task) for task in tasks]
+        for future in as_completed(futures):
+            if future.exception() is None:
+                summaries.append(future.result())
+            pbar.update(1)
+    if gate_threshold is not None:
+        print(gate_report(summaries, gate_threshold))
+    return format_case_summary(case_id, case, summaries)
+
+
 if __name__ == "__main__":
     print(case_summary(case_id="502", user_query=SAMPLE_USER_QUERY))
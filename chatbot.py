@@ -6,6 +6,7 @@ from google.genai import types
 import uuid
 from datetime import datetime
 from case import SAMPLE_USER_QUERY  
+from fulltext_index import FILTER_FIELDS, search_decisions
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -133,6 +134,19 @@ def chat():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Keyword search over decision passages, e.g. ?q="close connection test"&industry=Mining"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Empty query'}), 400
+    top_k = request.args.get('top_k', 10, type=int)
+    filters = {field: request.args.get(field) for field in FILTER_FIELDS}
+    try:
+        return jsonify({'results': search_decisions(query, top_k=top_k, **filters), 'status': 'success'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/clear', methods=['POST'])
 def clear_conversation():
     """Clear conversation history"""
@@ -1,10 +1,48 @@
 from case import SAMPLE_USER_QUERY
 from case_finder import find_cases
-from case_summarizer import case_summary
-from llm import call_llm, MODEL
+from case_summarizer import decision_tasks, format_case_summary, gate_report
+from collections import Counter
+from concurrent.futures import as_completed
+from llm import call_llm, MODEL, llm_thread_pool
 from tqdm import tqdm
 
 
+def summarize_cases(case_ids: list[str], user_query: str) -> dict[str, str]:
+    """
+    Summarizes the decisions of all cases through one queue, llm_thread_pool,
+    so the slowest decision rather than the slowest case sets the pace. Each
+    case's summary is assembled as soon as its last decision is back.
+    """
+    cases = {}
+    futures = {}
+    for case_id in case_ids:
+        case, tasks = decision_tasks(case_id=case_id, user_query=user_query)
+        cases[case_id] = case
+        for task in tasks:
+            futures[llm_thread_pool.submit(task)] = case_id
+    remaining = Counter(futures.values())
+    results = {case_id: [] for case_id in case_ids}
+    # Cases without decisions have nothing to wait for
+    case_summaries = {
+        case_id: format_case_summary(case_id, cases[case_id], []) for case_id in case_ids if not remaining[case_id]
+    }
+
+    with tqdm(total=len(futures), desc="Summarizing decisions") as pbar:
+        for future in as_completed(futures):
+            case_id = futures[future]
+            if future.exception() is not None:
+                pbar.write(f"Failed to summarize a decision of case_id={case_id}: {future.exception()!r}")
+            else:
+                results[case_id].append(future.result())
+            remaining[case_id] -= 1
+            if remaining[case_id] == 0:
+                case_summaries[case_id] = format_case_summary(case_id, cases[case_id], results[case_id])
+                pbar.write(f"Summarized case_id={case_id} ({len(case_summaries)}/{len(case_ids)} cases)")
+            pbar.update(1)
+    print(gate_report(summary for case_results in results.values() for summary in case_results))
+    return case_summaries
+
+
 def make_counter_claim(user_query: str):
     print("USER QUERY:")
     print(user_query)
@@ -12,11 +50,9 @@ def make_counter_claim(user_query: str):
     print("Finding relevant cases...")
     case_ids = find_cases(user_query=SAMPLE_USER_QUERY, top_n=8)
     print(f"Found relevant cases: {case_ids}")
-    case_summaries = []
-    for case_id in tqdm(case_ids, desc="Summarazing cases"):
-        case_summaries.append(case_summary(case_id=case_id, user_query=user_query))
+    case_summaries = summarize_cases(case_ids=case_ids, user_query=user_query)
     print("Producing report...")
-    summaries_str = "\n\n".join(case_summaries)
+    summaries_str = "\n\n".join(case_summaries[case_id] for case_id in case_ids)
     prompt = f"""Produce comprehensive precise report without omitting details satisfying:    
 
 1. Legal source retrieval
@@ -0,0 +1,71 @@
+import os
+import re
+import zlib
+from typing import Iterator, List
+
+# Rough size of a token in characters, good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+DECISION_CHUNK_TOKENS = int(os.environ.get("DECISION_CHUNK_TOKENS", 60_000))
+# About one paragraph in ANCHOR_EVERY may start a chunk on its own content
+ANCHOR_EVERY = 8
+PARAGRAPH_END_RE = re.compile(r"\n[ \t]*\n\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_oversized(piece: str, max_chars: int) -> Iterator[str]:
+    # A paragraph larger than a whole chunk: fall back to lines, then characters
+    current = ""
+    for line in piece.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield line[:max_chars]
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            yield current
+            current = ""
+        current += line
+    if current:
+        yield current
+
+
+def paragraphs(text: str, max_tokens: int = DECISION_CHUNK_TOKENS) -> Iterator[str]:
+    """Paragraphs with their trailing blank lines, none over max_tokens; they concatenate back to text."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    position = 0
+    for match in PARAGRAPH_END_RE.finditer(text):
+        yield from _split_oversized(text[position : match.end()], max_chars)
+        position = match.end()
+    if position < len(text):
+        yield from _split_oversized(text[position:], max_chars)
+
+
+def split_chunks(text: str, max_tokens: int = DECISION_CHUNK_TOKENS) -> List[str]:
+    """
+    Splits text into chunks of at most max_tokens on paragraph boundaries.
+
+    Besides the budget, a chunk also ends before any "anchor" paragraph (one
+    whose crc32 falls in 1/ANCHOR_EVERY) once it is half full. Anchors depend
+    only on content, so an edit shifts chunk boundaries locally and the
+    chunks after the next anchor, and their cached summaries, are unchanged.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in paragraphs(text, max_tokens):
+        tokens = estimate_tokens(paragraph)
+        anchor = zlib.crc32(paragraph.encode("utf-8")) % ANCHOR_EVERY == 0
+        if current and (current_tokens + tokens > max_tokens or (anchor and current_tokens >= max_tokens // 2)):
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+from concurrent.futures import as_completed
+from typing import Dict, Iterable, List, Optional
+
+from tqdm import tqdm
+
+from case import CASES_DIR, get_case
+from case_store import CASE_STORE_DIR, get_case_store
+from llm import MODEL, call_llm_json, llm_thread_pool
+
+DIGESTS_PATH = os.path.join(CASE_STORE_DIR, "digests.json")
+DIGEST_MODEL = MODEL.GEMINI_FLASH_LIGHT
+DIGEST_FIELDS = ("jurisdiction", "causation", "quantum", "outcome", "key_paragraphs")
+# Digests are flushed to disk this often during a build, so an interrupted
+# run keeps most of its work
+CHECKPOINT_EVERY = 50
+
+
+def digest_prompt(decision_content: str) -> str:
+    return f"""Read the full DECISION_CONTENT of an investment arbitration decision below and produce a structured digest of it. The digest will be reused to answer many different client questions, so do not assume any particular question: record what the tribunal found, not whether it is helpful.
+
+Respond with a JSON object with exactly these keys:
+- "jurisdiction": the tribunal's findings on jurisdiction and admissibility, in particular over any counterclaim of the respondent state (e.g. the 'close connection' test) and the reasoning given.
+- "causation": findings on the causal link between the investor's conduct and any alleged damage, the standard of proof applied, and how evidence such as expert reports was treated.
+- "quantum": how damages were assessed on the claim and any counterclaim, the methodology used, and the amounts claimed vs. awarded.
+- "outcome": the final outcome, including on any counterclaim.
+- "key_paragraphs": a list of up to 8 objects {{"paragraph": "<paragraph number or section heading>", "text": "<short verbatim quote>"}} with the passages most important for the points above.
+
+Use null for a topic the decision does not address. Do not invent paragraph numbers.
+
+<DECISION_CONTENT>
+{decision_content}
+</DECISION_CONTENT>
+"""
+
+
+def content_sha256(text: Optional[str]) -> str:
+    # Must match the hashes build_case_store writes for decision bodies
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _normalize(digest) -> dict:
+    if not isinstance(digest, dict):
+        raise ValueError(f"Digest is not a JSON object: {digest!r}")
+    return {field: digest.get(field) for field in DIGEST_FIELDS}
+
+
+class DigestStore:
+    """Decision digests keyed by the sha256 of the decision body, so they
+    survive case store rebuilds and are shared between identical decisions."""
+
+    def __init__(self, path: str = DIGESTS_PATH):
+        self.path = path
+        self.mtime_ns = None
+        self.digests: Dict[str, dict] = {}
+        if os.path.exists(path):
+            self.mtime_ns = os.stat(path).st_mtime_ns
+            with open(path, "r", encoding="utf-8") as f:
+                self.digests = json.load(f)["digests"]
+
+    def get(self, content_hash: str) -> Optional[dict]:
+        return self.digests.get(content_hash)
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.digests
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": DIGEST_MODEL.model_name(), "digests": self.digests}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.mtime_ns = os.stat(self.path).st_mtime_ns
+
+
+_digests: Optional[DigestStore] = None
+
+
+def get_digest_store(path: str = DIGESTS_PATH) -> DigestStore:
+    """Returns the process-wide digests, reloaded when the file changes."""
+    global _digests
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    if _digests is None or _digests.path != path or _digests.mtime_ns != mtime_ns:
+        _digests = DigestStore(path)
+    return _digests
+
+
+def case_digests(case_id: str, case=None) -> List[Optional[dict]]:
+    """The digest of each of the case's decisions (None where not built yet)."""
+    digests = get_digest_store()
+    store = get_case_store()
+    if store is not None and store.is_fresh(case_id, os.path.join(CASES_DIR, f"{case_id}.json")):
+        hashes = store.decision_hashes(case_id)
+    else:
+        case = case or get_case(case_id)
+        hashes = [content_sha256(decision.read_content()) for decision in case.decisions]
+    return [digests.get(content_hash) for content_hash in hashes]
+
+
+def build_digests(case_ids: Optional[Iterable[str]] = None, refresh: bool = False) -> int:
+    """
+    Digests every stored decision that has no digest yet (all of them with
+    refresh=True), across the shared LLM thread pool. Returns the number of
+    digests written.
+    """
+    store = get_case_store()
+    if store is None:
+        raise FileNotFoundError(f"No case store in {CASE_STORE_DIR}; run case_store.py first")
+    digests = get_digest_store()
+    pending = {}
+    for case_id in case_ids if case_ids is not None else store.case_ids():
+        record = store.record(case_id, lazy=True)
+        for content_hash, decision in zip(store.decision_hashes(case_id), record["Decisions"]):
+            if (refresh or content_hash not in digests) and len(decision["Content"]):
+                pending.setdefault(content_hash, decision["Content"])
+    print(f"{len(pending)} decisions to digest, {len(digests)} digests on file")
+
+    def digest_one(content_hash, content):
+        prompt = digest_prompt(content.resolve())
+        return content_hash, _normalize(call_llm_json(prompt=prompt, model=DIGEST_MODEL, refresh=refresh))
+
+    written = 0
+    futures = [llm_thread_pool.submit(digest_one, h, c) for h, c in pending.items()]
+    try:
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Digesting decisions"):
+            try:
+                content_hash, digest = future.result()
+            except Exception as e:
+                # One malformed answer should not lose the rest of the build
+                print(f"Failed to digest decision: {e}")
+                continue
+            digests.digests[content_hash] = digest
+            written += 1
+            if written % CHECKPOINT_EVERY == 0:
+                digests.save()
+    finally:
+        for future in futures:
+            future.cancel()
+        if written:
+            digests.save()
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("case_ids", nargs="*", help="defaults to every case in the store")
+    parser.add_argument("--refresh", action="store_true", help="re-digest decisions that already have a digest")
+    args = parser.parse_args()
+    count = build_digests(case_ids=args.case_ids or None, refresh=args.refresh)
+    print(f"Wrote {count} digests to {DIGESTS_PATH}")
@@ -0,0 +1,66 @@
+import os
+from typing import Dict, List, Tuple
+
+from text_tokens import tokenize
+
+DECISION_GATE_THRESHOLD = float(os.environ.get("DECISION_GATE_THRESHOLD", 0.05))
+# Opening text of each decision matched against the query
+GATE_EXCERPT_CHARS = 4000
+# A case always keeps this many of its best-scoring decisions
+GATE_KEEP_MIN = 1
+# Matched against "title type", lower-cased; procedural markers win ties,
+# so "Procedural Order on Jurisdiction" counts as procedural
+PROCEDURAL_MARKERS = ("procedural order", "order on", "minutes", "transcript", "press release", "letter", "correction")
+MERITS_MARKERS = ("award", "jurisdiction", "admissibility", "counterclaim", "merits", "liability", "damages", "annulment")
+PROCEDURAL_PRIOR = 0.3
+MERITS_PRIOR = 1.0
+OTHER_PRIOR = 0.6
+
+
+def type_prior(title: str, type_: str) -> float:
+    label = f"{title} {type_}".lower()
+    if any(marker in label for marker in PROCEDURAL_MARKERS):
+        return PROCEDURAL_PRIOR
+    if any(marker in label for marker in MERITS_MARKERS):
+        return MERITS_PRIOR
+    return OTHER_PRIOR
+
+
+def query_weights(user_query: str) -> Dict[str, float]:
+    """Query terms weighted by their idf in the full-text index when it is
+    built (terms it has never seen are dropped), uniformly otherwise."""
+    # Deferred: the full-text index needs numpy, which prompt building otherwise never loads
+    from fulltext_index import get_fulltext_index
+
+    terms = set(tokenize(user_query))
+    index = get_fulltext_index()
+    if index is None:
+        return {term: 1.0 for term in terms}
+    weights = {term: index.idf(term) for term in terms}
+    return {term: weight for term, weight in weights.items() if weight}
+
+
+def relevance_score(weights: Dict[str, float], decision) -> float:
+    """
+    Type prior times the idf-weighted share of query terms found in the
+    decision's title, type and opening excerpt. 0 (nothing in common) to 1.
+    """
+    total = sum(weights.values())
+    if not total:
+        return 1.0
+    tokens = set(tokenize(f"{decision.title}\n{decision.type}\n{decision.read_prefix(GATE_EXCERPT_CHARS)}"))
+    coverage = sum(weight for term, weight in weights.items() if term in tokens) / total
+    return type_prior(decision.title, decision.type) * coverage
+
+
+def gate_decisions(
+    user_query: str, decisions: list, threshold: float = DECISION_GATE_THRESHOLD
+) -> Tuple[List[float], List[bool]]:
+    """Scores each decision; returns (scores, keep) where keep is False for
+    decisions scoring below threshold, sparing the GATE_KEEP_MIN best."""
+    weights = query_weights(user_query)
+    scores = [relevance_score(weights, decision) for decision in decisions]
+    keep = [score >= threshold for score in scores]
+    for index in sorted(range(len(scores)), key=lambda i: -scores[i])[:GATE_KEEP_MIN]:
+        keep[index] = True
+    return scores, keep
@@ -0,0 +1,314 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+from tqdm import tqdm
+
+from case_facets import value_matches
+from case_store import CASE_STORE_DIR, get_case_store
+from text_tokens import tokenize
+
+FULLTEXT_DIR = "data/fulltext/"
+POSTINGS_FILE = "postings.bin"
+LEXICON_FILE = "lexicon.json"
+PASSAGES_FILE = "passages.npz"
+# Passages are cut on paragraph boundaries once they reach this many words
+PASSAGE_WORDS = 150
+BM25_K1 = 1.2
+BM25_B = 0.75
+FILTER_FIELDS = {
+    # query keyword -> case store metadata key
+    "industry": "Industries",
+    "status": "Status",
+    "institution": "Institution",
+    "treaty": "ApplicableTreaties",
+}
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """Vectorized LEB128 decode of a whole segment."""
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(b < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = (np.arange(len(b)) - starts[group]) * 7
+    return np.add.reduceat((b & 0x7F).astype(np.int64) << shift, starts)
+
+
+def split_passages(text: str, target_words: int = PASSAGE_WORDS):
+    """Yields (byte_start, byte_length) passages cut on paragraph boundaries."""
+    start = position = words = 0
+    for line in text.splitlines(keepends=True):
+        size = len(line.encode("utf-8"))
+        blank = not line.strip()
+        # Cut at a blank line once long enough, or mid-paragraph if far too long
+        if words and ((blank and words >= target_words) or words >= 4 * target_words):
+            yield start, position - start
+            start, words = position, 0
+        position += size
+        words += len(line.split())
+    if words:
+        yield start, position - start
+
+
+class _TermPostings:
+    __slots__ = ("docs", "positions", "last_passage", "df")
+
+    def __init__(self):
+        self.docs = bytearray()
+        self.positions = bytearray()
+        self.last_passage = 0
+        self.df = 0
+
+
+def build_fulltext_index(fulltext_dir: str = FULLTEXT_DIR, store_dir: str = CASE_STORE_DIR) -> int:
+    """
+    Builds the inverted index over every decision and opinion body in the
+    case store. Per term, the postings are a varint stream of interleaved
+    (passage id delta, tf) pairs, followed by a separate stream of in-passage
+    token positions (delta-encoded per passage), only read for phrase queries.
+    Returns the number of passages indexed.
+    """
+    store = get_case_store(store_dir)
+    if store is None:
+        raise FileNotFoundError(f"No case store in {store_dir}; run case_store.py first")
+
+    postings: Dict[str, _TermPostings] = {}
+    columns = {name: [] for name in ("case_row", "decision", "opinion", "offset", "length", "tokens")}
+
+    def index_body(case_row: int, decision: int, opinion: int, offset: int, length: int):
+        body = store.content_bytes(offset, length)
+        for start, size in split_passages(body.decode("utf-8")):
+            passage_id = len(columns["case_row"])
+            tokens = tokenize(body[start : start + size].decode("utf-8", "ignore"))
+            term_positions: Dict[str, List[int]] = {}
+            for i, token in enumerate(tokens):
+                term_positions.setdefault(token, []).append(i)
+            for term, term_pos in term_positions.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = _TermPostings()
+                encode_varint(passage_id - entry.last_passage, entry.docs)
+                encode_varint(len(term_pos), entry.docs)
+                previous = 0
+                for p in term_pos:
+                    encode_varint(p - previous, entry.positions)
+                    previous = p
+                entry.last_passage = passage_id
+                entry.df += 1
+            for name, value in zip(columns, (case_row, decision, opinion, offset + start, size, len(tokens))):
+                columns[name].append(value)
+
+    decisions, opinions = store.decisions, store.opinions
+    for case_row, case_id in enumerate(tqdm(store.case_ids(), desc="Indexing decisions")):
+        first = store.cases["decision_start"][case_row]
+        for d in range(first, first + store.cases["decision_count"][case_row]):
+            index_body(case_row, d, -1, decisions["offset"][d], decisions["length"][d])
+            first_opinion = decisions["opinion_start"][d]
+            for o in range(first_opinion, first_opinion + decisions["opinion_count"][d]):
+                index_body(case_row, d, o, opinions["offset"][o], opinions["length"][o])
+
+    os.makedirs(fulltext_dir, exist_ok=True)
+    lexicon = {}
+    offset = 0
+    with open(os.path.join(fulltext_dir, POSTINGS_FILE), "wb") as f:
+        for term in sorted(postings):
+            entry = postings[term]
+            f.write(entry.docs)
+            f.write(entry.positions)
+            lexicon[term] = [entry.df, offset, len(entry.docs), len(entry.positions)]
+            offset += len(entry.docs) + len(entry.positions)
+    with open(os.path.join(fulltext_dir, LEXICON_FILE), "w", encoding="utf-8") as f:
+        json.dump({"store_mtime_ns": store.index_mtime_ns, "terms": lexicon}, f, separators=(",", ":"))
+    np.savez(
+        os.path.join(fulltext_dir, PASSAGES_FILE),
+        **{name: np.array(values, dtype=np.int64) for name, values in columns.items()},
+    )
+    return len(columns["case_row"])
+
+
+def parse_query(query: str):
+    """Splits a query into quoted phrases and bare terms, both tokenized."""
+    phrases = [tokenize(p) for p in re.findall(r'"([^"]+)"', query)]
+    terms = tokenize(re.sub(r'"[^"]*"', " ", query))
+    return [p for p in phrases if p], terms
+
+
+class FulltextIndex:
+    """BM25 search over decision/opinion passages with phrase and field filters."""
+
+    def __init__(self, fulltext_dir: str = FULLTEXT_DIR):
+        self.fulltext_dir = fulltext_dir
+        self.mtime_ns = os.stat(os.path.join(fulltext_dir, LEXICON_FILE)).st_mtime_ns
+        with open(os.path.join(fulltext_dir, LEXICON_FILE), "r", encoding="utf-8") as f:
+            lexicon = json.load(f)
+        self.store_mtime_ns = lexicon["store_mtime_ns"]
+        self.terms = lexicon["terms"]
+        with np.load(os.path.join(fulltext_dir, PASSAGES_FILE)) as data:
+            self.passages = {name: data[name] for name in data.files}
+        self.average_tokens = max(float(self.passages["tokens"].mean()), 1.0) if len(self.passages["tokens"]) else 1.0
+        self._postings = open(os.path.join(fulltext_dir, POSTINGS_FILE), "rb")
+
+    def _read(self, offset: int, length: int) -> bytes:
+        return os.pread(self._postings.fileno(), length, offset)
+
+    def _postings_for(self, term: str):
+        """(passage ids, term frequencies) for a term, or None if unseen."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        df, offset, docs_length, _ = entry
+        values = decode_varints(self._read(offset, docs_length))
+        return np.cumsum(values[0::2]), values[1::2]
+
+    def idf(self, term: str) -> Optional[float]:
+        """BM25 idf of a term over all passages, or None if unseen."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        n_passages = len(self.passages["case_row"])
+        return float(np.log(1 + (n_passages - entry[0] + 0.5) / (entry[0] + 0.5)))
+
+    def _positions_for(self, term: str, passages: np.ndarray) -> Dict[int, set]:
+        df, offset, docs_length, positions_length = self.terms[term]
+        passage_ids, tfs = self._postings_for(term)
+        deltas = decode_varints(self._read(offset + docs_length, positions_length))
+        starts = np.cumsum(tfs) - tfs
+        found = {}
+        for i in np.searchsorted(passage_ids, passages):
+            found[int(passage_ids[i])] = set(np.cumsum(deltas[starts[i] : starts[i] + tfs[i]]).tolist())
+        return found
+
+    def _phrase_passages(self, phrase: List[str]) -> np.ndarray:
+        postings = [self._postings_for(term) for term in phrase]
+        if any(p is None for p in postings):
+            return np.zeros(0, dtype=np.int64)
+        candidates = postings[0][0]
+        for passage_ids, _ in postings[1:]:
+            candidates = np.intersect1d(candidates, passage_ids, assume_unique=True)
+        if len(phrase) == 1 or not len(candidates):
+            return candidates
+        positions = [self._positions_for(term, candidates) for term in phrase]
+        return np.array(
+            [
+                p
+                for p in candidates.tolist()
+                if any(all(start + i in positions[i][p] for i in range(1, len(phrase))) for start in positions[0][p])
+            ],
+            dtype=np.int64,
+        )
+
+    def _case_mask(self, store, filters: Dict[str, Optional[str]]) -> Optional[np.ndarray]:
+        active = {field: value for field, value in filters.items() if value}
+        if not active:
+            return None
+        allowed = np.zeros(len(store.case_ids()), dtype=bool)
+        for row, case_id in enumerate(store.case_ids()):
+            metadata = store.metadata(case_id)
+            matches = True
+            for field, value in active.items():
+                field_values = metadata[FILTER_FIELDS[field]]
+                if not isinstance(field_values, list):
+                    field_values = [field_values]
+                if not any(value_matches(value, v) for v in field_values):
+                    matches = False
+                    break
+            allowed[row] = matches
+        return allowed
+
+    def search(self, query: str, top_k: int = 10, **filters: Optional[str]) -> List[dict]:
+        """
+        Ranked passages for `query`. Quoted text is matched as a phrase (on
+        the stopword-filtered token stream); bare words are OR-ed. Filters:
+        industry, status, institution, treaty, matched like the facet filters
+        (whole value, case-insensitive; a trailing "*" matches by prefix).
+        """
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filters: {sorted(unknown)}")
+        store = get_case_store()
+        phrases, terms = parse_query(query)
+        n_passages = len(self.passages["case_row"])
+        scores = np.zeros(n_passages, dtype=np.float32)
+        lengths = self.passages["tokens"]
+        for term in set(terms + [t for phrase in phrases for t in phrase]):
+            postings = self._postings_for(term)
+            if postings is None:
+                continue
+            passage_ids, tfs = postings
+            idf = np.log(1 + (n_passages - len(passage_ids) + 0.5) / (len(passage_ids) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[passage_ids] / self.average_tokens)
+            scores[passage_ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+
+        mask = scores > 0
+        for phrase in phrases:
+            phrase_mask = np.zeros(n_passages, dtype=bool)
+            phrase_mask[self._phrase_passages(phrase)] = True
+            mask &= phrase_mask
+        case_mask = self._case_mask(store, filters)
+        if case_mask is not None:
+            mask &= case_mask[self.passages["case_row"]]
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [self._result(store, int(p), float(scores[p])) for p in candidates]
+
+    def _result(self, store, passage: int, score: float) -> dict:
+        columns = self.passages
+        case_id = store.case_ids()[columns["case_row"][passage]]
+        decision = int(columns["decision"][passage])
+        opinion = int(columns["opinion"][passage])
+        return {
+            "case_id": case_id,
+            "case_title": store.metadata(case_id)["Title"],
+            "decision_title": store.decisions["title"][decision],
+            "opinion_title": store.opinions["title"][opinion] if opinion >= 0 else None,
+            "score": round(score, 4),
+            "text": store.content(int(columns["offset"][passage]), int(columns["length"][passage])).strip(),
+        }
+
+
+_index: Optional[FulltextIndex] = None
+
+
+def get_fulltext_index(fulltext_dir: str = FULLTEXT_DIR) -> Optional[FulltextIndex]:
+    """Returns the process-wide index, reloading it after a rebuild. None if
+    not built or if the case store was rebuilt after it."""
+    global _index
+    try:
+        mtime_ns = os.stat(os.path.join(fulltext_dir, LEXICON_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _index is None or _index.fulltext_dir != fulltext_dir or _index.mtime_ns != mtime_ns:
+        _index = FulltextIndex(fulltext_dir)
+    store = get_case_store()
+    if store is None or store.index_mtime_ns != _index.store_mtime_ns:
+        print("Full-text index is out of date with the case store; run fulltext_index.py")
+        return None
+    return _index
+
+
+def search_decisions(query: str, top_k: int = 10, **filters: Optional[str]) -> List[dict]:
+    """Query API for case_finder and the chatbot. Empty if no index is built."""
+    index = get_fulltext_index()
+    if index is None:
+        return []
+    return index.search(query, top_k=top_k, **filters)
+
+
+if __name__ == "__main__":
+    count = build_fulltext_index()
+    print(f"Indexed {count} passages into {FULLTEXT_DIR}")
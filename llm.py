@@ -1,18 +1,35 @@
 from dotenv import load_dotenv
 import os
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+import httpx
 from tqdm import tqdm
 from enum import Enum, auto
 import asyncio
+import dataclasses
 import json
+import random
 import re
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional
+from llm_cache import cache_key, get_llm_cache
 
 
 load_dotenv()
 llm_thread_pool = ThreadPoolExecutor(max_workers=16)
 gemini_client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# Concurrent async calls allowed per event loop
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 16))
+# Rate limiter burst size, in seconds' worth of a model's request rate
+LLM_BURST_SECONDS = 10
+# HTTP statuses worth retrying: timeouts, rate limiting and server errors
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Runs the duplicate streams of hedged blocking calls
+hedge_thread_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
 
 
 class MODEL(Enum):
@@ -30,12 +47,148 @@ class MODEL(Enum):
         else:
             raise ValueError(f"Unknown model: {self}")
 
+    def requests_per_minute(self) -> float:
+        override = os.environ.get(f"LLM_RPM_{self.name}")
+        if override:
+            return float(override)
+        if self == MODEL.GEMINI_PRO:
+            return 150
+        elif self == MODEL.GEMINI_FLASH:
+            return 1000
+        elif self == MODEL.GEMINI_FLASH_LIGHT:
+            return 4000
+        else:
+            raise ValueError(f"Unknown model: {self}")
+
     def __str__(self) -> str:
         return self.name
 
 
-def call_llm(prompt: str, model: MODEL) -> str:
-    contents = [
+class TokenBucket:
+    """Request rate limiter shared by every thread and event loop. Callers
+    reserve a token up front and then wait out the returned delay."""
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1.0, self.rate * LLM_BURST_SECONDS)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token, going into debt if none is left; returns the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        try:
+            await asyncio.sleep(self.reserve())
+        except asyncio.CancelledError:
+            # The request will never be sent, so give its slot back
+            self.refund()
+            raise
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+_loop_semaphores = weakref.WeakKeyDictionary()
+
+
+def rate_limiter(model: MODEL) -> TokenBucket:
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            _rate_limiters[model] = TokenBucket(model.requests_per_minute())
+        return _rate_limiters[model]
+
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    # asyncio primitives belong to one loop, so each loop gets its own semaphore
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _loop_semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 4
+    # Backoff before retry n is uniform in [0, min(max_delay, base_delay * 2**n)]
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    # Seconds allowed for one attempt, including the whole stream
+    timeout: float = 300.0
+    # Launch a duplicate once an attempt outlives this latency quantile
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+# Per-model policies; replace an entry to reconfigure a model
+RETRY_POLICIES = {
+    MODEL.GEMINI_PRO: RetryPolicy(attempts=3, timeout=900.0),
+    MODEL.GEMINI_FLASH: RetryPolicy(timeout=300.0, hedge=True),
+    MODEL.GEMINI_FLASH_LIGHT: RetryPolicy(timeout=120.0, hedge=True),
+}
+
+
+class LatencyTracker:
+    """Recent successful call latencies of one model."""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+latencies = {model: LatencyTracker() for model in MODEL}
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def _hedge_threshold(model: MODEL, policy: RetryPolicy) -> Optional[float]:
+    if not policy.hedge:
+        return None
+    return latencies[model].quantile(policy.hedge_quantile, policy.hedge_min_samples)
+
+
+def generation_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        thinking_config=types.ThinkingConfig(thinking_budget=-1, include_thoughts=True),
+        response_mime_type="text/plain",
+    )
+
+
+def _contents(prompt: str) -> list:
+    return [
         types.Content(
             role="user",
             parts=[
@@ -43,29 +196,132 @@ def call_llm(prompt: str, model: MODEL) -> str:
             ],
         ),
     ]
-    generate_content_config = types.GenerateContentConfig(
-        thinking_config=types.ThinkingConfig(thinking_budget=-1, include_thoughts=True),
-        response_mime_type="text/plain",
-    )
 
+
+def _cache_lookup(prompt: str, model: MODEL, config: types.GenerateContentConfig, cache: bool, refresh: bool):
+    """Returns (cache, key, cached response or None); cache is None when bypassed."""
+    llm_cache = get_llm_cache() if cache else None
+    if llm_cache is None:
+        return None, None, None
+    key = cache_key(model.model_name(), config.model_dump_json(exclude_none=True, exclude={"http_options"}), prompt)
+    return llm_cache, key, None if refresh else llm_cache.get(key)
+
+
+def _attempt_config(policy: RetryPolicy) -> types.GenerateContentConfig:
+    config = generation_config()
+    # Bounds connecting and each read; the stream as a whole is bounded separately
+    config.http_options = types.HttpOptions(timeout=int(policy.timeout * 1000))
+    return config
+
+
+def _stream(
+    prompt: str,
+    model: MODEL,
+    policy: RetryPolicy,
+    cancelled: Optional[threading.Event] = None,
+    admitted: Optional[threading.Event] = None,
+) -> str:
+    rate_limiter(model).acquire()
+    if admitted is not None:
+        admitted.set()
+    # Timeout and latency are measured from here, not from submission
+    started = time.monotonic()
     response_text = ""
     stream = gemini_client.models.generate_content_stream(
         model=model.model_name(),
-        contents=contents,
-        config=generate_content_config,
+        contents=_contents(prompt),
+        config=_attempt_config(policy),
     )
+    try:
+        with tqdm(desc=f"Calling {model}", leave=False) as pbar:
+            for chunk in stream:
+                if cancelled is not None and cancelled.is_set():
+                    return response_text
+                if time.monotonic() - started > policy.timeout:
+                    raise TimeoutError(f"{model} call exceeded {policy.timeout}s")
+                if chunk.text:
+                    response_text += chunk.text
+                pbar.update(1)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    latencies[model].record(time.monotonic() - started)
+    return response_text
 
-    with tqdm(desc=f"Calling {model}", leave=False) as pbar:
-        for chunk in stream:
-            if chunk.text:
-                response_text += chunk.text
-            pbar.update(1)
 
-    return response_text
+def _hedged_stream(prompt: str, model: MODEL, policy: RetryPolicy) -> str:
+    threshold = _hedge_threshold(model, policy)
+    if threshold is None:
+        return _stream(prompt, model, policy)
+    # The loser sees the event between chunks and drops its stream
+    cancelled = threading.Event()
+    admitted = threading.Event()
+    first = hedge_thread_pool.submit(_stream, prompt, model, policy, cancelled, admitted)
+    futures = {first}
+    # Time queued for a worker or a rate-limit token is not call latency:
+    # start the hedge timer once the first attempt is actually sent
+    while not admitted.wait(timeout=0.05) and not first.done():
+        pass
+    if not wait(futures, timeout=threshold).done:
+        futures.add(hedge_thread_pool.submit(_stream, prompt, model, policy, cancelled))
+    error = None
+    while futures:
+        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                cancelled.set()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def call_llm(prompt: str, model: MODEL, cache: bool = True, refresh: bool = False) -> str:
+    """
+    Streams a Gemini response. Responses are cached on disk keyed by a hash
+    of (model name, generation config, prompt); cache=False bypasses the
+    cache entirely, refresh=True skips the lookup but stores the new answer.
+    Transient failures are retried and slow calls hedged per RETRY_POLICIES.
+    """
+    return _call_llm(prompt, model, cache, refresh, parse=None)
+
+
+def _call_llm(prompt: str, model: MODEL, cache: bool, refresh: bool, parse: Optional[Callable[[str], Any]]):
+    """call_llm, returning parse(response) if given. A response parse rejects
+    is never cached, and a cached one it rejects is fetched again."""
+    llm_cache, key, cached = _cache_lookup(prompt, model, generation_config(), cache, refresh)
+    if cached is not None:
+        if parse is None:
+            return cached
+        try:
+            return parse(cached)
+        except Exception:
+            print(f"Cached {model} response is unusable, calling the model again")
 
+    policy = RETRY_POLICIES[model]
+    for attempt in range(policy.attempts):
+        try:
+            response_text = _hedged_stream(prompt, model, policy)
+            break
+        except Exception as e:
+            if attempt + 1 == policy.attempts or not _is_retryable(e):
+                raise
+            delay = policy.backoff(attempt)
+            print(f"{model} call failed ({e!r}), retrying in {delay:.1f}s")
+            time.sleep(delay)
 
-def call_llm_json(prompt: str, model: MODEL):
-    response = call_llm(prompt, model)
+    result = parse(response_text) if parse is not None else response_text
+    if llm_cache is not None and response_text:
+        llm_cache.put(key, model.model_name(), response_text)
+    return result
+
+
+def call_llm_json(prompt: str, model: MODEL, cache: bool = True, refresh: bool = False):
+    """call_llm, parsed as JSON. Only responses that parse are cached."""
+    return _call_llm(prompt, model, cache, refresh, parse=_parse_json)
+
+
+def _parse_json(response: str):
     # Try to extract JSON from markdown code block
     match = re.search(r"```json\s*(.*?)\s*```", response, re.DOTALL)
     if match:
@@ -80,6 +336,96 @@ def call_llm_json(prompt: str, model: MODEL):
         raise
 
 
-async def call_llm_async(prompt: str, model: MODEL) -> str:
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, lambda: call_llm(prompt, model))
+async def _stream_async(
+    prompt: str, model: MODEL, policy: RetryPolicy, admitted: Optional[asyncio.Event] = None
+) -> str:
+    response_text = ""
+    async with _concurrency_limit():
+        await rate_limiter(model).acquire_async()
+        if admitted is not None:
+            admitted.set()
+        # The timeout covers the call itself, not the wait for a slot or token
+        started = time.monotonic()
+        async with asyncio.timeout(policy.timeout):
+            stream = await gemini_client.aio.models.generate_content_stream(
+                model=model.model_name(),
+                contents=_contents(prompt),
+                config=_attempt_config(policy),
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.text:
+                        response_text += chunk.text
+            finally:
+                await stream.aclose()
+    latencies[model].record(time.monotonic() - started)
+    return response_text
+
+
+async def _hedged_stream_async(prompt: str, model: MODEL, policy: RetryPolicy) -> str:
+    threshold = _hedge_threshold(model, policy)
+    if threshold is None:
+        return await _stream_async(prompt, model, policy)
+    admitted = asyncio.Event()
+    first = asyncio.ensure_future(_stream_async(prompt, model, policy, admitted))
+    tasks = {first}
+    try:
+        # Start the hedge timer only once the first attempt holds its slot and token
+        admission = asyncio.ensure_future(admitted.wait())
+        await asyncio.wait({first, admission}, return_when=asyncio.FIRST_COMPLETED)
+        admission.cancel()
+        done, _ = await asyncio.wait(tasks, timeout=threshold)
+        # A duplicate only helps if it can start now; with every slot taken it would queue too
+        if not done and not _concurrency_limit().locked():
+            tasks.add(asyncio.ensure_future(_stream_async(prompt, model, policy)))
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            # Check every finished task so a failed twin's error is not left unretrieved
+            winners = [task for task in done if task.exception() is None]
+            if winners:
+                return winners[0].result()
+            error = next(iter(done)).exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_llm_async(prompt: str, model: MODEL, cache: bool = True, refresh: bool = False) -> str:
+    """
+    Same as call_llm, but awaits the SDK's async stream instead of holding a
+    thread. At most LLM_MAX_CONCURRENCY calls run at once per event loop,
+    subject to the model's rate limit. Cancelling the task closes the stream.
+    """
+    llm_cache, key, cached = _cache_lookup(prompt, model, generation_config(), cache, refresh)
+    if cached is not None:
+        return cached
+
+    policy = RETRY_POLICIES[model]
+    for attempt in range(policy.attempts):
+        try:
+            response_text = await _hedged_stream_async(prompt, model, policy)
+            break
+        except Exception as e:
+            if attempt + 1 == policy.attempts or not _is_retryable(e):
+                raise
+            delay = policy.backoff(attempt)
+            print(f"{model} call failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    if llm_cache is not None and response_text:
+        llm_cache.put(key, model.model_name(), response_text)
+    return response_text
+
+
+async def call_llm_many(prompts: List[str], model: MODEL, cache: bool = True, refresh: bool = False) -> List[str]:
+    """Runs the prompts concurrently, in order. If one call fails the others are cancelled."""
+    async with asyncio.TaskGroup() as group:
+        tasks = [group.create_task(call_llm_async(p, model, cache=cache, refresh=refresh)) for p in prompts]
+    return [task.result() for task in tasks]
+
+
+def llm_cache_stats() -> dict:
+    llm_cache = get_llm_cache()
+    return llm_cache.stats() if llm_cache is not None else {"disabled": True}
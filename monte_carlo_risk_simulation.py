@@ -1,8 +1,19 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, render_template_string, request, jsonify, stream_with_context
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import argparse
+import dataclasses
+import functools
+import hashlib
 import numpy as np
 import json
+import os
+import shelve
+import threading
 from scipy import stats
 from scipy.stats import gaussian_kde
+from scipy.signal import fftconvolve
 import logging
 
 # Suppress werkzeug logs for cleaner output
@@ -25,32 +36,177 @@ TRIBUNAL_MULTIPLIERS = {
     'Pro-State': 0.90
 }
 
-def run_monte_carlo_simulation(jurisdiction, causation, evidence, precedent, damages, tribunal_stance, iterations=5000):
-    """Run Monte Carlo simulation with given parameters"""
-    results = []
-    
-    for _ in range(iterations):
-        # Generate random scores with uncertainty (std dev = 15)
-        jurisdiction_score = np.clip(np.random.normal(jurisdiction, 15), 0, 100)
-        causation_score = np.clip(np.random.normal(causation, 15), 0, 100)
-        evidence_score = np.clip(np.random.normal(evidence, 15), 0, 100)
-        precedent_score = np.clip(np.random.normal(precedent, 15), 0, 100)
-        damages_score = np.clip(np.random.normal(damages, 15), 0, 100)
-        
-        # Calculate weighted score
-        weighted_score = (
-            jurisdiction_score * WEIGHTS['Jurisdiction'] +
-            causation_score * WEIGHTS['Causation'] +
-            evidence_score * WEIGHTS['Evidence'] +
-            precedent_score * WEIGHTS['Precedent'] +
-            damages_score * WEIGHTS['Damages_Credibility']
+# Factor order used for the batched score matrix columns
+FACTORS = ['Jurisdiction', 'Causation', 'Evidence', 'Precedent', 'Damages_Credibility']
+SCORE_STD_DEV = 15
+DEFAULT_ITERATIONS = 5000
+MAX_ITERATIONS = 10_000_000
+
+PROFILES_PATH = os.environ.get('SIMULATION_PROFILES_PATH', 'simulation_profiles.json')
+DEFAULT_PROFILE = 'default'
+
+
+@dataclasses.dataclass(frozen=True)
+class SimulationProfile:
+    """Validated model configuration, precomputed as NumPy arrays"""
+    name: str
+    weights: np.ndarray
+    std_devs: np.ndarray
+    correlation: np.ndarray
+    tribunal_multipliers: dict
+    description: str = ""
+    # Lower-triangular factor of the covariance matrix, None when independent
+    cholesky: np.ndarray = None
+
+    @classmethod
+    def from_dict(cls, name, data):
+        weights = np.array([float(data['weights'][f]) for f in FACTORS])
+        if np.any(weights < 0) or not np.isclose(weights.sum(), 1.0):
+            raise ValueError(f"Profile {name}: weights must be non-negative and sum to 1")
+
+        std_devs = data.get('std_devs', SCORE_STD_DEV)
+        if isinstance(std_devs, dict):
+            std_devs = [std_devs[f] for f in FACTORS]
+        std_devs = np.broadcast_to(np.asarray(std_devs, dtype=float), (len(FACTORS),)).copy()
+        if np.any(std_devs <= 0):
+            raise ValueError(f"Profile {name}: std_devs must be positive")
+
+        correlation = np.asarray(data.get('correlation', np.eye(len(FACTORS))), dtype=float)
+        if correlation.shape != (len(FACTORS), len(FACTORS)):
+            raise ValueError(f"Profile {name}: correlation must be {len(FACTORS)}x{len(FACTORS)}")
+        if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1):
+            raise ValueError(f"Profile {name}: correlation must be symmetric with a unit diagonal")
+        cholesky = None
+        if not np.array_equal(correlation, np.eye(len(FACTORS))):
+            covariance = correlation * np.outer(std_devs, std_devs)
+            try:
+                cholesky = np.linalg.cholesky(covariance)
+            except np.linalg.LinAlgError:
+                raise ValueError(f"Profile {name}: correlation must be positive definite")
+
+        multipliers = {k: float(v) for k, v in data.get('tribunal_multipliers', TRIBUNAL_MULTIPLIERS).items()}
+        if not multipliers or any(v <= 0 for v in multipliers.values()):
+            raise ValueError(f"Profile {name}: tribunal_multipliers must be non-empty and positive")
+
+        for array in (weights, std_devs, correlation, cholesky):
+            if array is not None:
+                array.setflags(write=False)
+        return cls(
+            name=name,
+            weights=weights,
+            std_devs=std_devs,
+            correlation=correlation,
+            tribunal_multipliers=multipliers,
+            description=data.get('description', ""),
+            cholesky=cholesky,
         )
-        
-        # Apply tribunal multiplier
-        final_score = np.clip(weighted_score * TRIBUNAL_MULTIPLIERS[tribunal_stance], 0, 100)
-        results.append(final_score)
-    
-    return np.array(results)
+
+    def sample_noise(self, rng, iterations):
+        """Zero-mean factor deviations as one (iterations, 5) batched draw"""
+        noise = rng.standard_normal((iterations, len(FACTORS)))
+        if self.cholesky is None:
+            noise *= self.std_devs
+            return noise
+        return noise @ self.cholesky.T
+
+    def fingerprint(self):
+        """Hash of the resolved model, so cached results change with the profiles file"""
+        model = {k: v for k, v in self.to_dict().items() if k != 'description'}
+        return hashlib.sha256(json.dumps(model, sort_keys=True).encode()).hexdigest()[:16]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'weights': dict(zip(FACTORS, self.weights.tolist())),
+            'std_devs': dict(zip(FACTORS, self.std_devs.tolist())),
+            'correlation': self.correlation.tolist(),
+            'tribunal_multipliers': self.tribunal_multipliers
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def load_profiles(path=PROFILES_PATH):
+    """Load and validate profiles once; the built-in default is always present"""
+    profiles = {DEFAULT_PROFILE: SimulationProfile.from_dict(DEFAULT_PROFILE, {
+        'weights': WEIGHTS,
+        'tribunal_multipliers': TRIBUNAL_MULTIPLIERS,
+        'description': 'Independent factors, std dev 15, module WEIGHTS'
+    })}
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        for name, profile in data.get('profiles', {}).items():
+            profiles[name] = SimulationProfile.from_dict(name, profile)
+    return profiles
+
+def get_profile(name=None):
+    profiles = load_profiles()
+    name = name or DEFAULT_PROFILE
+    if name not in profiles:
+        raise ValueError(f"Unknown profile: {name}")
+    return profiles[name]
+
+def run_monte_carlo_simulation(jurisdiction, causation, evidence, precedent, damages, tribunal_stance, iterations=DEFAULT_ITERATIONS, seed=None, profile=None):
+    """Run Monte Carlo simulation with given parameters"""
+    rng = np.random.default_rng(seed)
+    model = get_profile(profile)
+    means = np.array([jurisdiction, causation, evidence, precedent, damages], dtype=float)
+
+    # Draw all factor scores at once as an (iterations, 5) matrix with uncertainty
+    scores = model.sample_noise(rng, iterations)
+    scores += means
+    np.clip(scores, 0, 100, out=scores)
+
+    # Weighted score per iteration, then tribunal multiplier
+    final_scores = scores @ model.weights
+    final_scores *= model.tribunal_multipliers[tribunal_stance]
+    np.clip(final_scores, 0, 100, out=final_scores)
+    return final_scores
+
+# Fixed shard size: the shard layout depends only on the iteration count, so
+# sharded results are bit-identical for any number of workers
+SHARD_SIZE = 250_000
+# Every request shares one pool, so `workers` only caps a request's share of it
+MAX_WORKERS = os.cpu_count() or 1
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _simulate_shard(task):
+    params, iterations, seed_sequence = task
+    return run_monte_carlo_simulation(**params, iterations=iterations, seed=np.random.default_rng(seed_sequence))
+
+def get_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _process_pool
+
+def run_parallel_simulation(params, iterations=DEFAULT_ITERATIONS, workers=None, seed=None, shard_size=SHARD_SIZE):
+    """Run the simulation in fixed-size shards across a process pool.
+
+    Each shard draws from its own SeedSequence.spawn child, and shards are
+    merged in order, so the result depends only on (seed, iterations).
+    At most `workers` shards (clamped to MAX_WORKERS) are in flight at once.
+    """
+    workers = min(workers or MAX_WORKERS, MAX_WORKERS)
+    n_shards = -(-iterations // shard_size)
+    sizes = [shard_size] * (n_shards - 1) + [iterations - shard_size * (n_shards - 1)]
+    children = np.random.SeedSequence(seed).spawn(n_shards)
+    tasks = list(zip(repeat(params), sizes, children))
+
+    if workers == 1 or n_shards == 1:
+        return np.concatenate([_simulate_shard(task) for task in tasks])
+    pool = get_process_pool()
+    shards = []
+    pending = deque()
+    for task in tasks:
+        if len(pending) == workers:
+            shards.append(pending.popleft().result())
+        pending.append(pool.submit(_simulate_shard, task))
+    shards.extend(future.result() for future in pending)
+    return np.concatenate(shards)
 
 def calculate_metrics(results):
     """Calculate key metrics from simulation results"""
@@ -66,17 +222,57 @@ def calculate_metrics(results):
         'success_prob': round(success_probability, 1)
     }
 
-def generate_density_data(results):
-    """Generate kernel density estimation data for plotting"""
-    # Create KDE
-    kde = gaussian_kde(results)
-    
+DENSITY_METHODS = ('auto', 'kde', 'histogram')
+DENSITY_POINTS = 200
+DENSITY_BINS = 2048
+# Above this many samples 'auto' switches from exact KDE to the binned estimator
+KDE_MAX_SAMPLES = 20000
+
+def binned_kde(results, x_range, bins=DENSITY_BINS):
+    """Linear-binning KDE smoothed with an FFT convolution.
+
+    Uses the same Gaussian kernel and Scott's-rule bandwidth as gaussian_kde,
+    but costs O(n + bins log bins) instead of O(n * len(x_range)).
+    """
+    n = len(results)
+    std = results.std(ddof=1) if n > 1 else 0.0
+    bandwidth = std * n ** (-1 / 5) if std > 0 else 0.5
+
+    # Grid wide enough that the kernel tails never fall off the edges
+    lo = min(results.min(), x_range[0]) - 4 * bandwidth
+    hi = max(results.max(), x_range[-1]) + 4 * bandwidth
+    delta = (hi - lo) / (bins - 1)
+    grid = lo + delta * np.arange(bins)
+
+    # Split each sample's unit mass between its two neighbouring grid points
+    position = (results - lo) / delta
+    index = np.minimum(position.astype(np.int64), bins - 2)
+    upper = position - index
+    counts = np.bincount(index, weights=1 - upper, minlength=bins)
+    counts += np.bincount(index + 1, weights=upper, minlength=bins)
+
+    half_width = int(np.ceil(4 * bandwidth / delta))
+    offsets = delta * np.arange(-half_width, half_width + 1)
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    smoothed = fftconvolve(counts, kernel, mode='same') / n
+    return np.interp(x_range, grid, np.maximum(smoothed, 0))
+
+def generate_density_data(results, method='auto', points=DENSITY_POINTS):
+    """Generate kernel density estimation data for plotting at `points` x values"""
+    if method not in DENSITY_METHODS:
+        raise ValueError(f"Unknown density method: {method}")
+    if method == 'auto':
+        method = 'kde' if len(results) <= KDE_MAX_SAMPLES else 'histogram'
+
     # Generate x values for smooth curve
     x_min, x_max = results.min(), results.max()
-    x_range = np.linspace(max(0, x_min - 5), min(100, x_max + 5), 200)
+    x_range = np.linspace(max(0, x_min - 5), min(100, x_max + 5), points)
     
     # Calculate density
-    density = kde(x_range)
+    if method == 'kde':
+        density = gaussian_kde(results)(x_range)
+    else:
+        density = binned_kde(results, x_range)
     
     return {
         'x': x_range.tolist(),
@@ -84,6 +280,277 @@ def generate_density_data(results):
         'median': float(np.percentile(results, 50))
     }
 
+# Request parameter names, aligned with FACTORS
+PARAMETERS = ['jurisdiction', 'causation', 'evidence', 'precedent', 'damages']
+SWEEPABLE = PARAMETERS + ['tribunal_stance']
+DEFAULT_SWEEP_GRID = list(range(0, 101, 10))
+SENSITIVITY_DELTA = 10
+MAX_SWEEP_SAMPLES = 20_000_000
+
+def evaluate_grid(noise, params, sweep):
+    """Score every cell of a one- or two-factor grid against shared noise.
+
+    `noise` is an (iterations, 5) matrix of zero-mean factor deviations that
+    is reused for every cell (common random numbers). `sweep` is a list of
+    (factor, values) pairs; the result has shape (len(values_1), ..., iterations).
+    """
+    iterations = noise.shape[0]
+    ndim = len(sweep)
+    swept = dict(sweep)
+    model = get_profile(params.get('profile'))
+
+    def along_axis(array, axis):
+        # Place the grid dimension of `array` on `axis` for broadcasting
+        shape = [1] * ndim + [array.shape[-1]]
+        shape[axis] = array.shape[0]
+        return array.reshape(shape)
+
+    weighted = np.zeros(iterations)
+    for column, name in enumerate(PARAMETERS):
+        if name in swept:
+            continue
+        scores = np.clip(params[name] + noise[:, column], 0, 100)
+        weighted += scores * model.weights[column]
+    weighted = weighted.reshape([1] * ndim + [iterations])
+
+    multiplier = model.tribunal_multipliers[params['tribunal_stance']]
+    for axis, (name, values) in enumerate(sweep):
+        if name == 'tribunal_stance':
+            multipliers = np.array([[model.tribunal_multipliers[v]] for v in values])
+            multiplier = along_axis(multipliers, axis)
+            continue
+        column = PARAMETERS.index(name)
+        scores = np.asarray(values, dtype=float)[:, None] + noise[:, column]
+        np.clip(scores, 0, 100, out=scores)
+        weighted = weighted + along_axis(scores * model.weights[column], axis)
+
+    return np.clip(weighted * multiplier, 0, 100)
+
+def calculate_surface_metrics(results):
+    """Calculate metrics for every grid cell along the last axis"""
+    p25, median, p75 = np.percentile(results, [25, 50, 75], axis=-1)
+    success_probability = np.mean(results > 50, axis=-1) * 100
+    return {
+        'median': np.round(median, 1).tolist(),
+        'p25': np.round(p25, 1).tolist(),
+        'p75': np.round(p75, 1).tolist(),
+        'success_prob': np.round(success_probability, 1).tolist()
+    }
+
+def calculate_sensitivity(noise, params, delta=SENSITIVITY_DELTA):
+    """Tornado data: success probability swing when each factor moves low/high"""
+    multipliers = get_profile(params.get('profile')).tribunal_multipliers
+    sensitivity = []
+    for name in SWEEPABLE:
+        if name == 'tribunal_stance':
+            low, high = min(multipliers, key=multipliers.get), max(multipliers, key=multipliers.get)
+        else:
+            low, high = max(0, params[name] - delta), min(100, params[name] + delta)
+        results = evaluate_grid(noise, params, [(name, [low, high])])
+        low_prob, high_prob = np.mean(results > 50, axis=-1) * 100
+        sensitivity.append({
+            'factor': name,
+            'low': low,
+            'high': high,
+            'low_success_prob': round(float(low_prob), 1),
+            'high_success_prob': round(float(high_prob), 1),
+            'swing': round(float(abs(high_prob - low_prob)), 1)
+        })
+    return sorted(sensitivity, key=lambda item: item['swing'], reverse=True)
+
+def run_sweep(params, sweep, iterations=DEFAULT_ITERATIONS, seed=None):
+    """Evaluate a scenario grid and per-factor sensitivity in one batch"""
+    rng = np.random.default_rng(seed)
+    noise = get_profile(params.get('profile')).sample_noise(rng, iterations)
+    results = evaluate_grid(noise, params, sweep)
+    return {
+        'factors': [name for name, _ in sweep],
+        'grid': [list(values) for _, values in sweep],
+        'surfaces': calculate_surface_metrics(results),
+        'sensitivity': calculate_sensitivity(noise, params)
+    }
+
+def parse_simulation_params(data):
+    """Extract base slider parameters from a request payload"""
+    params = {name: int(data[name]) for name in PARAMETERS}
+    params['tribunal_stance'] = data['tribunal_stance']
+    params['profile'] = data.get('profile') or DEFAULT_PROFILE
+    if params['tribunal_stance'] not in get_profile(params['profile']).tribunal_multipliers:
+        raise ValueError(f"Unknown tribunal_stance: {params['tribunal_stance']}")
+    return params
+
+def parse_iterations(data):
+    iterations = int(data.get('iterations', DEFAULT_ITERATIONS))
+    if not 1 <= iterations <= MAX_ITERATIONS:
+        raise ValueError(f"iterations must be between 1 and {MAX_ITERATIONS}")
+    return iterations
+
+def parse_seed(data):
+    """Optional seed as an int (JSON numbers and query-string text alike); None when absent"""
+    seed = data.get('seed')
+    if seed in (None, ''):
+        return None
+    if isinstance(seed, bool) or (isinstance(seed, float) and not seed.is_integer()):
+        raise ValueError("seed must be an integer")
+    seed = int(seed)
+    if seed < 0:
+        raise ValueError("seed must be a non-negative integer")
+    return seed
+
+STREAM_CHUNK_SIZE = 2000
+# Enough for a 0.5 point success interval at any probability (~154k draws)
+STREAM_MAX_ITERATIONS = 200_000
+STREAM_TOLERANCE = 0.5
+CONFIDENCE_Z = 1.96
+
+def success_confidence_interval(successes, n, z=CONFIDENCE_Z):
+    """Wilson score interval for the success probability, in percent"""
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return (center - half_width) * 100, (center + half_width) * 100
+
+def stream_monte_carlo_simulation(params, max_iterations=STREAM_MAX_ITERATIONS, tolerance=STREAM_TOLERANCE,
+                                  chunk_size=STREAM_CHUNK_SIZE, seed=None, density_method='auto'):
+    """Run the simulation in growing chunks, yielding metrics after each one.
+
+    Stops once the success-probability confidence interval is narrower than
+    `tolerance` percentage points, or after `max_iterations` draws. Chunks are
+    drawn from one generator, so a seeded stream matches /simulate for the
+    same final iteration count.
+    """
+    rng = np.random.default_rng(seed)
+    chunks = []
+    completed = 0
+    successes = 0
+    while completed < max_iterations:
+        size = min(chunk_size, max_iterations - completed)
+        chunk = run_monte_carlo_simulation(**params, iterations=size, seed=rng)
+        chunks.append(chunk)
+        completed += size
+        successes += int(np.sum(chunk > 50))
+        # Double the chunk each round so total work stays linear in iterations
+        chunk_size *= 2
+
+        results = np.concatenate(chunks)
+        chunks = [results]
+        ci_low, ci_high = success_confidence_interval(successes, completed)
+        converged = tolerance is not None and bool(ci_high - ci_low <= tolerance)
+        yield {
+            'iterations': completed,
+            'metrics': {k: float(v) for k, v in calculate_metrics(results).items()},
+            'density_data': generate_density_data(results, method=density_method),
+            'success_ci': [round(ci_low, 2), round(ci_high, 2)],
+            'done': converged or completed >= max_iterations
+        }
+        if converged:
+            break
+
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+class SimulationCache:
+    """Bounded LRU cache of /simulate results, optionally mirrored to disk.
+
+    On disk each value is stored as (sequence, value), where the sequence
+    number grows with every put or hit, so recency survives a restart.
+    """
+
+    def __init__(self, max_size=256, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._shelf = shelve.open(path) if path else None
+        if self._shelf is not None:
+            self._warm()
+
+    def _warm(self):
+        """Load the most recently used entries from the previous process and drop the rest from disk"""
+        # dbm key order is arbitrary, so rank entries by their stored sequence numbers
+        stored = []
+        for key in list(self._shelf.keys()):
+            record = self._shelf[key]
+            if isinstance(record, tuple) and len(record) == 2:
+                stored.append((record[0], key, record[1]))
+            else:
+                # Written before sequence numbers were stored
+                del self._shelf[key]
+        stored.sort(key=lambda item: item[0])
+        keep = max(0, len(stored) - self.max_size)
+        for _, key, _ in stored[:keep]:
+            del self._shelf[key]
+        for _, key, value in stored[keep:]:
+            self._entries[key] = value
+        self._sequence = stored[-1][0] if stored else 0
+        self._shelf.sync()
+
+    def _store(self, key, value):
+        self._sequence += 1
+        self._shelf[key] = (self._sequence, value)
+
+    @staticmethod
+    def make_key(**fields):
+        return json.dumps(fields, sort_keys=True)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if self._shelf is not None:
+                    self._store(key, self._entries[key])
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self._shelf is not None:
+                self._store(key, value)
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                if self._shelf is not None and evicted in self._shelf:
+                    del self._shelf[evicted]
+            if self._shelf is not None:
+                self._shelf.sync()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._shelf is not None:
+                self._shelf.clear()
+                self._shelf.sync()
+
+    def close(self):
+        with self._lock:
+            if self._shelf is not None:
+                self._shelf.close()
+                self._shelf = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'persistent': self.path is not None
+            }
+
+simulation_cache = SimulationCache(
+    max_size=int(os.environ.get('SIMULATION_CACHE_SIZE', 256)),
+    path=os.environ.get('SIMULATION_CACHE_PATH')
+)
+
 @app.route('/')
 def index():
     return render_template_string(HTML_TEMPLATE)
@@ -94,33 +561,150 @@ def simulate():
         data = request.json
         
         # Extract parameters
-        jurisdiction = int(data['jurisdiction'])
-        causation = int(data['causation'])
-        evidence = int(data['evidence'])
-        precedent = int(data['precedent'])
-        damages = int(data['damages'])
-        tribunal_stance = data['tribunal_stance']
+        params = parse_simulation_params(data)
+        iterations = parse_iterations(data)
+        seed = parse_seed(data)
+        density_method = data.get('density_method', 'auto')
+        workers = data.get('workers')
+        if workers is not None:
+            workers = int(workers)
+            if workers < 1:
+                raise ValueError("workers must be positive")
         
-        # Run simulation
-        results = run_monte_carlo_simulation(
-            jurisdiction, causation, evidence, precedent, damages, tribunal_stance
+        # Worker count does not change sharded results, only whether we shard
+        cache_key = SimulationCache.make_key(
+            **params, profile_hash=get_profile(params['profile']).fingerprint(),
+            iterations=iterations, seed=seed, density_method=density_method, sharded=workers is not None
         )
+        cached = simulation_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({'success': True, 'cached': True, **cached})
+        
+        # Run simulation
+        if workers is not None:
+            results = run_parallel_simulation(params, iterations=iterations, workers=workers, seed=seed)
+        else:
+            results = run_monte_carlo_simulation(
+                **params, iterations=iterations, seed=seed
+            )
         
         # Calculate metrics
-        metrics = calculate_metrics(results)
+        metrics = {k: float(v) for k, v in calculate_metrics(results).items()}
         
         # Generate density data
-        density_data = generate_density_data(results)
+        density_data = generate_density_data(results, method=density_method)
         
-        return jsonify({
-            'success': True,
-            'metrics': metrics,
-            'density_data': density_data
-        })
+        response = {'metrics': metrics, 'density_data': density_data}
+        simulation_cache.put(cache_key, response)
+        return jsonify({'success': True, 'cached': False, **response})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/simulate/stream', methods=['GET', 'POST'])
+def simulate_stream():
+    data = request.json if request.method == 'POST' else request.args
+    try:
+        params = parse_simulation_params(data)
+        max_iterations = int(data.get('iterations', STREAM_MAX_ITERATIONS))
+        if not 1 <= max_iterations <= MAX_ITERATIONS:
+            raise ValueError(f"iterations must be between 1 and {MAX_ITERATIONS}")
+        tolerance = data.get('tolerance', STREAM_TOLERANCE)
+        tolerance = float(tolerance) if tolerance not in (None, '') else None
+        chunk_size = int(data.get('chunk_size', STREAM_CHUNK_SIZE))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        seed = parse_seed(data)
+        density_method = data.get('density_method', 'auto')
+        if density_method not in DENSITY_METHODS:
+            raise ValueError(f"Unknown density method: {density_method}")
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    # Shares simulation_cache with /simulate; a repeated stream is answered with one 'done' event
+    cache_key = SimulationCache.make_key(
+        **params, profile_hash=get_profile(params['profile']).fingerprint(),
+        iterations=max_iterations, seed=seed, density_method=density_method,
+        tolerance=tolerance, chunk_size=chunk_size, stream=True
+    )
+
+    def events():
+        try:
+            cached = simulation_cache.get(cache_key)
+            if cached is not None:
+                yield format_sse('done', {**cached, 'cached': True})
+                return
+            for update in stream_monte_carlo_simulation(
+                params, max_iterations=max_iterations, tolerance=tolerance,
+                chunk_size=chunk_size, seed=seed, density_method=density_method
+            ):
+                if update['done']:
+                    simulation_cache.put(cache_key, update)
+                yield format_sse('done' if update['done'] else 'progress', {**update, 'cached': False})
+        except Exception as e:
+            yield format_sse('failed', {'error': str(e)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/sweep', methods=['POST'])
+def sweep():
+    try:
+        data = request.json
+        
+        # Extract base parameters and the factors to sweep
+        params = parse_simulation_params(data)
+        iterations = parse_iterations(data)
+        seed = parse_seed(data)
+        sweep_spec = data['sweep']
+        if not 1 <= len(sweep_spec) <= 2:
+            raise ValueError("sweep must list one or two factors")
+        
+        grid = []
+        for axis in sweep_spec:
+            name = axis['factor']
+            if name not in SWEEPABLE:
+                raise ValueError(f"Unknown sweep factor: {name}")
+            if name == 'tribunal_stance':
+                multipliers = get_profile(params['profile']).tribunal_multipliers
+                values = axis.get('values', list(multipliers))
+                unknown = [v for v in values if v not in multipliers]
+                if unknown:
+                    raise ValueError(f"Unknown tribunal_stance values: {unknown}")
+            else:
+                values = [int(v) for v in axis.get('values', DEFAULT_SWEEP_GRID)]
+            grid.append((name, values))
+        if len({name for name, _ in grid}) != len(grid):
+            raise ValueError("sweep factors must be distinct")
+        
+        cells = int(np.prod([len(values) for _, values in grid]))
+        if cells * iterations > MAX_SWEEP_SAMPLES:
+            raise ValueError(f"sweep too large: {cells} cells x {iterations} iterations exceeds {MAX_SWEEP_SAMPLES} samples")
+        
+        # Evaluate all cells in one batch with common random numbers
+        result = run_sweep(params, grid, iterations=iterations, seed=seed)
+        
+        return jsonify({'success': True, **result})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/profiles', methods=['GET'])
+def profiles():
+    return jsonify({name: profile.to_dict() for name, profile in load_profiles().items()})
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(simulation_cache.stats())
+
+@app.route('/cache/clear', methods=['POST'])
+def cache_clear():
+    simulation_cache.clear()
+    return jsonify({'success': True})
+
 # HTML Template
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
@@ -272,6 +856,15 @@ HTML_TEMPLATE = '''
             border-color: #667eea;
         }
 
+        .checkbox-label {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            font-size: 0.9rem;
+            color: #555;
+            cursor: pointer;
+        }
+
         .run-button {
             width: 100%;
             padding: 15px;
@@ -457,6 +1050,13 @@ HTML_TEMPLATE = '''
                 </div>
             </div>
 
+            <div class="control-group">
+                <label class="checkbox-label">
+                    <input type="checkbox" id="streamResults">
+                    Refine progressively until the estimate converges
+                </label>
+            </div>
+
             <button id="runSimulation" class="run-button">Run Simulation</button>
         </div>
 
@@ -469,7 +1069,7 @@ HTML_TEMPLATE = '''
             
             <div id="loading" class="loading">
                 <div class="spinner"></div>
-                <p>Running Monte Carlo simulation with 5,000 iterations...</p>
+                <p id="loadingText">Running Monte Carlo simulation...</p>
             </div>
 
             <div id="results" class="results">
@@ -652,6 +1252,18 @@ HTML_TEMPLATE = '''
                 tribunal_stance: document.getElementById('tribunalStance').value
             };
             
+            function finish() {
+                button.disabled = false;
+                button.textContent = 'Run Simulation';
+            }
+            
+            if (document.getElementById('streamResults').checked) {
+                streamSimulation(data, finish);
+                return;
+            }
+            
+            document.getElementById('loadingText').textContent = 'Running Monte Carlo simulation...';
+            
             // Call Flask backend
             fetch('/simulate', {
                 method: 'POST',
@@ -680,19 +1292,94 @@ HTML_TEMPLATE = '''
                 document.getElementById('loading').style.display = 'none';
                 document.getElementById('initialMessage').style.display = 'block';
             })
-            .finally(() => {
-                button.disabled = false;
-                button.textContent = 'Run Simulation';
-            });
+            .finally(finish);
         });
+        
+        // Stream progressively refined results from the Flask backend
+        function streamSimulation(data, finish) {
+            function showUpdate(event) {
+                const update = JSON.parse(event.data);
+                updateMetrics(update.metrics);
+                createDensityPlot(update.density_data);
+                document.getElementById('loadingText').textContent =
+                    `Refining: ${update.iterations.toLocaleString()} iterations, success ${update.success_ci[0]}%–${update.success_ci[1]}%`;
+                
+                // Show results as soon as the first chunk arrives
+                document.getElementById('results').style.display = 'block';
+                return update;
+            }
+            
+            const source = new EventSource('/simulate/stream?' + new URLSearchParams(data).toString());
+            source.addEventListener('progress', showUpdate);
+            source.addEventListener('done', event => {
+                source.close();
+                showUpdate(event);
+                document.getElementById('loading').style.display = 'none';
+                finish();
+            });
+            source.addEventListener('failed', event => {
+                source.close();
+                showError('Simulation failed: ' + JSON.parse(event.data).error);
+                document.getElementById('loading').style.display = 'none';
+                document.getElementById('initialMessage').style.display = 'block';
+                finish();
+            });
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) return;
+                source.close();
+                showError('Network error while streaming simulation results');
+                document.getElementById('loading').style.display = 'none';
+                finish();
+            };
+        }
     </script>
 </body>
 </html>
 '''
 
-if __name__ == '__main__':
+def serve():
     print("🚀 Starting Counterclaim Risk Simulator...")
     print("📊 Navigate to http://localhost:5002 to use the simulator")
     print("⚖️  Based on Burlington, Perenco, and Rusoro case analysis")
     print("🎯 Optimized for Fenoscadia v. Kronos counterclaim strategy")
-    app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5002)
+
+def batch(argv=None):
+    """Offline batch run: python monte_carlo_risk_simulation.py batch ..."""
+    parser = argparse.ArgumentParser(prog='monte_carlo_risk_simulation.py batch')
+    for name in PARAMETERS:
+        parser.add_argument(f'--{name}', type=int, required=True)
+    parser.add_argument('--tribunal-stance', default='Neutral')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, choices=list(load_profiles()))
+    parser.add_argument('--iterations', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None, help='defaults to the number of CPUs')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--density-method', default='auto', choices=DENSITY_METHODS)
+    parser.add_argument('--output', default=None, help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    params = {name: getattr(args, name) for name in PARAMETERS}
+    params['tribunal_stance'] = args.tribunal_stance
+    params['profile'] = args.profile
+    if args.tribunal_stance not in get_profile(args.profile).tribunal_multipliers:
+        parser.error(f"unknown tribunal stance for profile {args.profile}: {args.tribunal_stance}")
+    results = run_parallel_simulation(params, iterations=args.iterations, workers=args.workers, seed=args.seed)
+    output = json.dumps({
+        'params': params,
+        'iterations': args.iterations,
+        'seed': args.seed,
+        'metrics': {k: float(v) for k, v in calculate_metrics(results).items()},
+        'density_data': generate_density_data(results, method=args.density_method)
+    })
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch(sys.argv[2:])
+    else:
+        serve()
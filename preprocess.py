@@ -1,30 +1,97 @@
 # pip install google-genai dotenv tqdm
 
+import argparse
 import csv
-from case import list_cases, load_case_json
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from case import CASES_DIR, list_cases, load_case_json
 from tqdm import tqdm
 
+CASES_CSV_PATH = "cases.csv"
+MANIFEST_PATH = "data/preprocess_manifest.json"
+CSV_HEADER = ["case_id", "status", "nationalities", "title", "industries"]
 
-def process_all_cases():
+
+def case_row(case_id: str) -> list:
+    # Only metadata is needed, so leave decision bodies in the store
+    case = load_case_json(case_id=case_id, lazy=True)
+    industries_str = ", ".join(case.industries)
+    party_nationalities_str = ", ".join(case.party_nationalities)
+    return [case_id, case.status, party_nationalities_str, case.title, industries_str]
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path: str) -> dict:
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def process_all_cases(workers=None, full=False, output_path=CASES_CSV_PATH, manifest_path=MANIFEST_PATH):
     """
     Loads all cases from the data directory, extracts relevant data,
-    and saves it as a CSV file named cases.csv, sorted by industry.
+    and saves it as a CSV file named cases.csv, sorted by case id.
+
+    The build is incremental: a manifest records each source file's
+    mtime/size/sha256 and its CSV row, so only new or changed cases are
+    reparsed (across a process pool). Rows are streamed to the output.
     """
+    manifest = {} if full else load_manifest(manifest_path)
+    entries = {}
+    changed = []
+    for case_id in sorted(list_cases()):
+        file_path = os.path.join(CASES_DIR, f"{case_id}.json")
+        stat = os.stat(file_path)
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        old = manifest.get(case_id)
+        if old and old["mtime_ns"] == entry["mtime_ns"] and old["size"] == entry["size"]:
+            entries[case_id] = old
+            continue
+        # Stat changed: only a different hash means the case needs reparsing
+        entry["sha256"] = file_sha256(file_path)
+        if old and old["sha256"] == entry["sha256"]:
+            entries[case_id] = {**old, **entry}
+            continue
+        entry["row"] = None
+        entries[case_id] = entry
+        changed.append(case_id)
+    print(f"{len(changed)} new or changed cases, {len(entries) - len(changed)} unchanged")
 
-    cases_data = []
-    for case_id in tqdm(list_cases()):
-        case = load_case_json(case_id=case_id)
-        industries_str = ", ".join(case.industries)
-        party_nationalities_str = ", ".join(case.party_nationalities)
-        cases_data.append(
-            [case_id, case.status, party_nationalities_str, case.title, industries_str]
-        )
+    tmp_path = output_path + ".tmp"
+    pool = ProcessPoolExecutor(max_workers=workers) if len(changed) > 1 else None
+    try:
+        parsed = pool.map(case_row, changed, chunksize=8) if pool else map(case_row, changed)
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            # pool.map yields in submission order, which follows the sorted ids
+            for case_id, entry in tqdm(entries.items(), total=len(entries)):
+                if entry["row"] is None:
+                    entry["row"] = next(parsed)
+                writer.writerow(entry["row"])
+    finally:
+        if pool:
+            pool.shutdown()
+    os.replace(tmp_path, output_path)
 
-    with open("cases.csv", "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["case_id", "status", "nationalities", "title", "industries"])
-        writer.writerows(cases_data)
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
 
 
 if __name__ == "__main__":
-    process_all_cases()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and reparse every case")
+    args = parser.parse_args()
+    process_all_cases(workers=args.workers, full=args.full)
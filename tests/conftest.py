@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live at the repository root; keep tests off the real API and cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ["LLM_CACHE_DISABLED"] = "1"
+
+
+class FakeGemini(ThreadingHTTPServer):
+    """
+    Local stand-in for the Gemini streaming endpoint. behaviour(prompt, n)
+    is called for the n-th request (from 0) and returns (status, delay) or
+    (status, delay, text): a 200 streams text (default: the prompt) back in
+    two chunks with delay seconds between them, any other status is
+    returned as an API error.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeGeminiHandler)
+        self.behaviour = lambda prompt, n: (200, 0.0)
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class _FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["contents"][0]["parts"][0]["text"]
+        with server._lock:
+            n = server.requests
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            status, delay, *text = server.behaviour(prompt, n)
+            text = text[0] if text else prompt
+            if status != 200:
+                error = json.dumps({"error": {"code": status, "message": "fake failure", "status": "UNAVAILABLE"}})
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(error)))
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(error.encode())
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            half = len(text) // 2
+            for i, part in enumerate((text[:half], text[half:])):
+                if i:
+                    time.sleep(delay)
+                chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": part}]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client dropped a hedged or timed-out stream
+            pass
+        finally:
+            with server._lock:
+                server.active -= 1
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Points llm at a FakeGemini server with fresh limiters and latency stats."""
+    from google import genai
+    from google.genai import types
+
+    import llm
+
+    server = FakeGemini()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = genai.Client(api_key="test", http_options=types.HttpOptions(base_url=server.base_url))
+    monkeypatch.setattr(llm, "gemini_client", client)
+    monkeypatch.setattr(llm, "_rate_limiters", {})
+    monkeypatch.setattr(llm, "latencies", {model: llm.LatencyTracker() for model in llm.MODEL})
+    monkeypatch.setenv("LLM_RPM_GEMINI_FLASH_LIGHT", "1000000")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def llm_cache(tmp_path, monkeypatch):
+    """Enables the response cache, in a fresh database."""
+    import llm_cache as llm_cache_module
+
+    cache = llm_cache_module.LLMCache(path=str(tmp_path / "llm_cache.sqlite"))
+    monkeypatch.setattr(llm_cache_module, "LLM_CACHE_DISABLED", False)
+    monkeypatch.setattr(llm_cache_module, "_cache", cache)
+    return cache
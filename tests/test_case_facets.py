@@ -0,0 +1,68 @@
+import csv
+import json
+import os
+
+import pytest
+
+from case import CASES_DIR
+from case_facets import FacetIndex, value_matches
+
+ROWS = [
+    ("0", "Decided in favor of State", "Mining", "Oman"),
+    ("1", "Decided in favor of investor", "Metal ores", "Romania"),
+    ("2", "Pending", "Mining, Oil & Gas", "Niger"),
+    ("3", "Decided in favor of neither Party", "Mining", "Nigeria"),
+]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """cases.csv plus case files, without a case store."""
+    monkeypatch.chdir(tmp_path)
+    with open("cases.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["case_id", "status", "title", "industries", "nationalities"])
+        for case_id, status, industry, nationality in ROWS:
+            writer.writerow([case_id, status, f"Case {case_id}", industry, nationality])
+    os.makedirs(CASES_DIR)
+    for case_id, status, industry, nationality in ROWS[:3]:
+        metadata = {
+            "Identifier": case_id,
+            "Title": f"Case {case_id}",
+            "CaseNumber": None,
+            "Industries": [industry],
+            "Status": status,
+            "PartyNationalities": [nationality],
+            "Institution": "ICSID" if case_id != "1" else "PCA",
+            "RulesOfArbitration": [],
+            "ApplicableTreaties": ["Energy Charter Treaty"],
+        }
+        text = json.dumps(metadata)
+        # Bodies come after the metadata and are never decoded: make them unparseable
+        text = text[:-1] + ', "Decisions": [not json'
+        with open(os.path.join(CASES_DIR, f"{case_id}.json"), "w", encoding="utf-8") as f:
+            f.write(text)
+    return FacetIndex.build("cases.csv")
+
+
+def test_value_matches_whole_values():
+    assert value_matches("oman", "Oman")
+    assert not value_matches("Oman", "Romania")
+    assert not value_matches("Niger", "Nigeria")
+    assert value_matches("Decided*", "Decided in favor of State")
+    assert not value_matches("Decided", "Decided in favor of State")
+
+
+def test_filters_match_exact_values(workspace):
+    assert workspace.filter(nationality="Oman") == ["0"]
+    assert workspace.filter(nationality="Niger") == ["2"]
+    assert workspace.filter(industry="Metal") == []
+    assert workspace.filter(status="Decided*") == ["0", "1", "3"]
+    assert workspace.filter(status="decided*", nationality=["Romania", "Nigeria"]) == ["1", "3"]
+
+
+def test_store_facets_come_from_case_files_without_a_store(workspace):
+    assert workspace.filter(institution="ICSID") == ["0", "2"]
+    assert workspace.filter(treaty="Energy Charter Treaty") == ["0", "1", "2"]
+    # No case file: cases.csv still provides industry and nationality
+    assert workspace.filter(nationality="Nigeria") == ["3"]
@@ -0,0 +1,40 @@
+import csv
+
+import pytest
+
+import case_finder
+from case_index import build_case_index
+
+ROWS = [
+    ("1", "Decided in favor of State", "Oman", "Mining counterclaim for environmental damage", "Mining"),
+    ("2", "Pending", "Spain", "Solar tariff reform", "Renewable energy"),
+]
+
+
+def write_catalogue(rows):
+    with open("cases.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["case_id", "status", "nationalities", "title", "industries"])
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(case_finder, "catalogue", case_finder.CaseCatalogue())
+    write_catalogue(ROWS)
+    build_case_index(backend="tfidf")
+
+
+def prompt_ids(prompt):
+    return [line.split(",")[0].removeprefix("- Case ID: ") for line in prompt.splitlines()]
+
+
+def test_candidates_come_from_the_index(workspace):
+    assert prompt_ids(case_finder.candidate_cases_prompt("mining counterclaim", candidates=1)) == ["1"]
+
+
+def test_cases_added_after_the_index_are_candidates(workspace):
+    write_catalogue(ROWS + [("3", "Pending", "Peru", "Copper mine expropriation", "Mining")])
+    assert prompt_ids(case_finder.candidate_cases_prompt("solar tariff", candidates=1)) == ["2", "3"]
+    assert prompt_ids(case_finder.candidate_cases_prompt("solar", candidates=1, filters={"nationality": "Peru"})) == ["3"]
@@ -0,0 +1,77 @@
+import glob
+import json
+import os
+
+import pytest
+
+from case_store import INDEX_FILE, CaseStore, build_case_store
+
+
+def write_case(cases_dir, case_id, content):
+    case = {
+        "Identifier": case_id,
+        "Title": f"Case {case_id}",
+        "Status": "Concluded",
+        "Institution": "ICSID",
+        "Decisions": [
+            {
+                "Title": "Award",
+                "Type": "Award",
+                "Date": "2020-01-02",
+                "Content": content,
+                "Opinions": [{"Title": "Dissent", "Type": "Dissenting Opinion", "Content": "I disagree."}],
+            }
+        ],
+    }
+    with open(os.path.join(cases_dir, f"{case_id}.json"), "w") as f:
+        json.dump(case, f)
+
+
+@pytest.fixture
+def cases_dir(tmp_path):
+    path = tmp_path / "cases"
+    path.mkdir()
+    return str(path)
+
+
+def test_store_round_trips_bodies(cases_dir, tmp_path):
+    write_case(cases_dir, "a", "First award ✓")
+    write_case(cases_dir, "b", "")
+    store_dir = str(tmp_path / "store")
+    assert build_case_store(cases_dir, store_dir) == 2
+
+    store = CaseStore(store_dir)
+    record = store.record("a")
+    assert record["Decisions"][0]["Content"] == "First award ✓"
+    assert record["Decisions"][0]["Opinions"][0]["Content"] == "I disagree."
+    assert store.record("b", lazy=True)["Decisions"][0]["Content"].resolve() == ""
+
+
+def test_rebuild_keeps_open_store_readable(cases_dir, tmp_path):
+    store_dir = str(tmp_path / "store")
+    write_case(cases_dir, "a", "Old award")
+    build_case_store(cases_dir, store_dir)
+    old = CaseStore(store_dir)
+
+    for version in range(3):
+        write_case(cases_dir, "a", f"New award {version}, with a longer body")
+        build_case_store(cases_dir, store_dir)
+
+    # The old reader keeps its own blob; a new reader sees the new index and blob together
+    assert old.record("a")["Decisions"][0]["Content"] == "Old award"
+    assert CaseStore(store_dir).record("a")["Decisions"][0]["Content"] == "New award 2, with a longer body"
+    # Only the current and the previous build's blobs are kept on disk
+    assert len(glob.glob(os.path.join(store_dir, "content-*.bin"))) == 2
+
+
+def test_truncated_blob_is_rejected(cases_dir, tmp_path):
+    store_dir = str(tmp_path / "store")
+    write_case(cases_dir, "a", "An award body")
+    build_case_store(cases_dir, store_dir)
+    with open(os.path.join(store_dir, INDEX_FILE)) as f:
+        content_file = json.load(f)["content_file"]
+    with open(os.path.join(store_dir, content_file), "r+b") as f:
+        f.truncate(3)
+
+    with pytest.raises(ValueError, match="bytes"):
+        CaseStore(store_dir)
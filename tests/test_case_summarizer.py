@@ -0,0 +1,80 @@
+import copy
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+import yaml
+
+from case import Case, Decision, Opinion
+from case_summarizer import CaseMetadata, DecisionMetadata, case_yaml, decision_yaml
+
+
+def make_case(identifier, title, case_number, dates, text):
+    decisions = [
+        Decision(
+            title=f"{title} — decision {i}",
+            type="Award" if i % 2 else "Procedural Order No. 1: Jurisdiction",
+            date=date,
+            opinions=[Opinion(title="Dissent", type="Dissenting Opinion", date=date, content=text)],
+            content=text * (i + 1),
+        )
+        for i, date in enumerate(dates)
+    ]
+    return Case(
+        identifier=identifier,
+        title=title,
+        case_number=case_number,
+        industries=["Mining", "Oil, Gas & Mining"],
+        status="Decided in favour of State",
+        party_nationalities=["Côte d'Ivoire", "Netherlands"],
+        institution="ICSID",
+        rules_of_arbitration=[],
+        applicable_treaties=["Energy Charter Treaty (1994)"],
+        decisions=decisions,
+    )
+
+
+CASES = [
+    make_case("case-1", "Fenoscadia v. Kronos", "ARB/12/34", [datetime(2020, 1, 2), None], "Body text.\n\n" * 3),
+    make_case("case-2", "A: 'quoted' \"title\" # with, punctuation", None, [], "x"),
+    make_case(
+        "case-3",
+        "A very long title that goes on and on past the emitter's preferred line width " * 3,
+        "UNCITRAL",
+        [datetime(1999, 12, 31, 23, 59, 59)] * 3,
+        "Ünïcödé ‘body’ \t tab",
+    ),
+]
+
+
+def old_rendering(case):
+    """What decision_tasks rendered before the projections: yaml.dump of a stripped deepcopy."""
+    case_copy = copy.deepcopy(case)
+    for decision in case_copy.decisions:
+        decision.content = None
+        decision.opinions = None
+    return yaml.dump(case_copy, sort_keys=False), [yaml.dump(decision) for decision in case_copy.decisions]
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.identifier)
+def test_prompt_yaml_matches_yaml_dump(case):
+    expected_case, expected_decisions = old_rendering(case)
+    assert case_yaml(CaseMetadata.from_case(case)) == expected_case
+    assert [decision_yaml(DecisionMetadata.from_decision(d)) for d in case.decisions] == expected_decisions
+
+
+def test_rendering_leaves_the_case_untouched():
+    case = CASES[0]
+    before = copy.deepcopy(case)
+    case_yaml(CaseMetadata.from_case(case))
+    assert case == before
+
+
+def test_importing_the_pipeline_does_not_load_numpy():
+    # The indexes load numpy/scipy lazily, on the first query that needs them
+    code = "import sys, counter_claim; print(sorted({'numpy', 'scipy'} & set(sys.modules)))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from case import CASES_DIR
+from case_store import build_case_store
+from fulltext_index import build_fulltext_index, search_decisions
+
+CASES = {
+    "ect": ("ECT", "Metal ores"),
+    "bit": ("Agreement for the Promotion and Reciprocal Protection of Investments", "Manufacturing of basic metals"),
+    "metal": ("Energy Charter Treaty", "Metal"),
+}
+
+
+@pytest.fixture
+def indexed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(CASES_DIR)
+    for case_id, (treaty, industry) in CASES.items():
+        case = {
+            "Identifier": case_id,
+            "Title": f"Case {case_id}",
+            "Industries": [industry],
+            "Status": "Decided in favor of State",
+            "Institution": "ICSID",
+            "ApplicableTreaties": [treaty],
+            "Decisions": [{"Title": "Award", "Type": "Award", "Content": "The tribunal finds an indirect expropriation."}],
+        }
+        with open(os.path.join(CASES_DIR, f"{case_id}.json"), "w") as f:
+            json.dump(case, f)
+    build_case_store(CASES_DIR)
+    build_fulltext_index()
+
+
+def case_ids(results):
+    return sorted(result["case_id"] for result in results)
+
+
+def test_filters_match_whole_values(indexed):
+    assert case_ids(search_decisions("expropriation")) == ["bit", "ect", "metal"]
+    assert case_ids(search_decisions("expropriation", treaty="ECT")) == ["ect"]
+    assert case_ids(search_decisions("expropriation", industry="metal")) == ["metal"]
+    assert case_ids(search_decisions("expropriation", industry="Metal*")) == ["ect", "metal"]
+    assert case_ids(search_decisions("expropriation", status="Decided*", treaty="energy charter treaty")) == ["metal"]
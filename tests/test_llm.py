@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+
+import pytest
+from google.genai import errors
+
+import llm
+from llm import MODEL, RetryPolicy
+
+MODEL_UNDER_TEST = MODEL.GEMINI_FLASH_LIGHT
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    def set_policy(**kwargs):
+        kwargs.setdefault("base_delay", 0.01)
+        monkeypatch.setitem(llm.RETRY_POLICIES, MODEL_UNDER_TEST, RetryPolicy(**kwargs))
+
+    return set_policy
+
+
+def seed_latencies(seconds: float, count: int = 20) -> None:
+    for _ in range(count):
+        llm.latencies[MODEL_UNDER_TEST].record(seconds)
+
+
+def test_call_llm_streams_response(fake_gemini, policy):
+    policy()
+    assert llm.call_llm("hello world", MODEL_UNDER_TEST) == "hello world"
+    assert asyncio.run(llm.call_llm_async("hello async", MODEL_UNDER_TEST)) == "hello async"
+    assert fake_gemini.requests == 2
+
+
+def test_retryable_status_is_retried(fake_gemini, policy):
+    policy(attempts=3)
+    fake_gemini.behaviour = lambda prompt, n: (503 if n % 2 == 0 else 200, 0.0)
+    assert llm.call_llm("sync", MODEL_UNDER_TEST) == "sync"
+    assert asyncio.run(llm.call_llm_async("async", MODEL_UNDER_TEST)) == "async"
+    assert fake_gemini.requests == 4
+
+
+def test_client_error_is_not_retried(fake_gemini, policy):
+    policy(attempts=3)
+    fake_gemini.behaviour = lambda prompt, n: (400, 0.0)
+    with pytest.raises(errors.ClientError):
+        asyncio.run(llm.call_llm_async("bad request", MODEL_UNDER_TEST))
+    assert fake_gemini.requests == 1
+
+
+def test_slow_call_times_out(fake_gemini, policy):
+    policy(attempts=1, timeout=0.3)
+    fake_gemini.behaviour = lambda prompt, n: (200, 2.0)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(llm.call_llm_async("stalls", MODEL_UNDER_TEST))
+    assert time.monotonic() - started < 1.5
+
+
+def test_queued_calls_do_not_time_out(fake_gemini, policy, monkeypatch):
+    # 10 calls of 0.5s through 2 slots take ~2.5s, but each call is within its 1.2s timeout
+    monkeypatch.setattr(llm, "LLM_MAX_CONCURRENCY", 2)
+    policy(attempts=1, timeout=1.2, hedge=True)
+    fake_gemini.behaviour = lambda prompt, n: (200, 0.5)
+    prompts = [f"prompt {i}" for i in range(10)]
+    assert asyncio.run(llm.call_llm_many(prompts, MODEL_UNDER_TEST)) == prompts
+    assert fake_gemini.max_active <= 2
+
+
+def test_saturated_calls_are_not_hedged(fake_gemini, policy, monkeypatch):
+    # Every call outlives the 0.3s hedge threshold, but with all slots busy a duplicate would only queue
+    monkeypatch.setattr(llm, "LLM_MAX_CONCURRENCY", 2)
+    policy(attempts=1, timeout=1.2, hedge=True)
+    seed_latencies(0.3)
+    fake_gemini.behaviour = lambda prompt, n: (200, 0.5)
+    prompts = [f"prompt {i}" for i in range(6)]
+    assert asyncio.run(llm.call_llm_many(prompts, MODEL_UNDER_TEST)) == prompts
+    assert fake_gemini.requests == len(prompts)
+
+
+def test_straggler_is_hedged(fake_gemini, policy):
+    policy(hedge=True)
+    seed_latencies(0.05)
+    # The first request of each call stalls; the duplicate answers at once
+    fake_gemini.behaviour = lambda prompt, n: (200, 3.0 if n % 2 == 0 else 0.0)
+
+    started = time.monotonic()
+    assert llm.call_llm("sync straggler", MODEL_UNDER_TEST) == "sync straggler"
+    assert time.monotonic() - started < 1.0
+
+    started = time.monotonic()
+    assert asyncio.run(llm.call_llm_async("async straggler", MODEL_UNDER_TEST)) == "async straggler"
+    assert time.monotonic() - started < 1.0
+    assert fake_gemini.requests == 4
+
+
+def test_unparseable_json_is_not_cached(fake_gemini, policy, llm_cache):
+    policy()
+    answers = ["not json {", '```json\n{"ok": true}\n```']
+    fake_gemini.behaviour = lambda prompt, n: (200, 0.0, answers[min(n, 1)])
+    with pytest.raises(json.JSONDecodeError):
+        llm.call_llm_json("query", MODEL_UNDER_TEST)
+    assert llm_cache.stats()["entries"] == 0
+    # The next call asks the model again, and its valid answer is cached
+    assert llm.call_llm_json("query", MODEL_UNDER_TEST) == {"ok": True}
+    assert llm.call_llm_json("query", MODEL_UNDER_TEST) == {"ok": True}
+    assert fake_gemini.requests == 2
+
+
+def test_unparseable_cached_json_is_fetched_again(fake_gemini, policy, llm_cache):
+    policy()
+    fake_gemini.behaviour = lambda prompt, n: (200, 0.0, '["case_1"]')
+    # A bad answer cached as plain text, e.g. before JSON responses were checked
+    assert llm.call_llm("query", MODEL_UNDER_TEST) == '["case_1"]'
+    _, key, _ = llm._cache_lookup("query", MODEL_UNDER_TEST, llm.generation_config(), True, False)
+    llm_cache.put(key, MODEL_UNDER_TEST.model_name(), "truncated [")
+    assert llm.call_llm_json("query", MODEL_UNDER_TEST) == ["case_1"]
+    assert llm.call_llm_json("query", MODEL_UNDER_TEST) == ["case_1"]
+    assert fake_gemini.requests == 2
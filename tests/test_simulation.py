@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+import monte_carlo_risk_simulation
+from monte_carlo_risk_simulation import (
+    SHARD_SIZE,
+    TRIBUNAL_MULTIPLIERS,
+    SimulationCache,
+    SimulationProfile,
+    WEIGHTS,
+    run_monte_carlo_simulation,
+    run_parallel_simulation,
+)
+
+PARAMS = {
+    "jurisdiction": 70,
+    "causation": 45,
+    "evidence": 60,
+    "precedent": 55,
+    "damages": 75,
+}
+
+
+def loop_simulation(rng, jurisdiction, causation, evidence, precedent, damages, tribunal_stance, iterations):
+    """The original per-iteration engine, drawing from rng instead of the global state."""
+    results = []
+    for _ in range(iterations):
+        jurisdiction_score = np.clip(rng.normal(jurisdiction, 15), 0, 100)
+        causation_score = np.clip(rng.normal(causation, 15), 0, 100)
+        evidence_score = np.clip(rng.normal(evidence, 15), 0, 100)
+        precedent_score = np.clip(rng.normal(precedent, 15), 0, 100)
+        damages_score = np.clip(rng.normal(damages, 15), 0, 100)
+        weighted_score = (
+            jurisdiction_score * WEIGHTS["Jurisdiction"]
+            + causation_score * WEIGHTS["Causation"]
+            + evidence_score * WEIGHTS["Evidence"]
+            + precedent_score * WEIGHTS["Precedent"]
+            + damages_score * WEIGHTS["Damages_Credibility"]
+        )
+        results.append(np.clip(weighted_score * TRIBUNAL_MULTIPLIERS[tribunal_stance], 0, 100))
+    return np.array(results)
+
+
+@pytest.mark.parametrize("tribunal_stance", list(TRIBUNAL_MULTIPLIERS))
+def test_vectorized_matches_loop(tribunal_stance):
+    expected = loop_simulation(np.random.default_rng(42), **PARAMS, tribunal_stance=tribunal_stance, iterations=5000)
+    actual = run_monte_carlo_simulation(
+        **PARAMS, tribunal_stance=tribunal_stance, iterations=5000, seed=np.random.default_rng(42)
+    )
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+
+
+def test_seeded_runs_are_reproducible():
+    first = run_monte_carlo_simulation(**PARAMS, tribunal_stance="Neutral", iterations=1000, seed=7)
+    second = run_monte_carlo_simulation(**PARAMS, tribunal_stance="Neutral", iterations=1000, seed=7)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_sharded_results_do_not_depend_on_workers():
+    params = {**PARAMS, "tribunal_stance": "Pro-State"}
+    iterations = 2 * SHARD_SIZE + 17
+    serial = run_parallel_simulation(params, iterations=iterations, workers=1, seed=3)
+    parallel = run_parallel_simulation(params, iterations=iterations, workers=10_000, seed=3)
+    assert len(serial) == iterations
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_persistent_cache_keeps_most_recently_used(tmp_path):
+    path = str(tmp_path / "cache")
+    cache = SimulationCache(max_size=10, path=path)
+    for i in range(10):
+        cache.put(f"key-{i}", {"value": i})
+    # Touch the oldest entries so they are the most recently used
+    for i in range(3):
+        assert cache.get(f"key-{i}") == {"value": i}
+    cache.close()
+
+    warmed = SimulationCache(max_size=4, path=path)
+    assert list(warmed._entries) == ["key-9", "key-0", "key-1", "key-2"]
+    assert warmed.get("key-1") == {"value": 1}
+    assert warmed.get("key-5") is None
+    warmed.close()
+
+    # Entries beyond max_size were deleted from disk, not just skipped
+    reopened = SimulationCache(max_size=10, path=path)
+    assert sorted(reopened._entries) == ["key-0", "key-1", "key-2", "key-9"]
+    reopened.close()
+
+
+def test_edited_profile_misses_the_cache(monkeypatch):
+    monkeypatch.setattr(monte_carlo_risk_simulation, "simulation_cache", SimulationCache())
+    client = monte_carlo_risk_simulation.app.test_client()
+    payload = {**PARAMS, "tribunal_stance": "Neutral", "profile": "custom", "seed": 1, "iterations": 500}
+
+    def serve(weights, description=""):
+        profile = SimulationProfile.from_dict("custom", {"weights": weights, "description": description})
+        monkeypatch.setattr(monte_carlo_risk_simulation, "load_profiles", lambda: {"custom": profile})
+        return client.post("/simulate", json=payload).json
+
+    assert not serve(WEIGHTS)["cached"]
+    assert serve(WEIGHTS, description="reworded")["cached"]
+    assert not serve({**WEIGHTS, "Jurisdiction": 0.30, "Causation": 0.40})["cached"]
+
+
+def test_endpoints_parse_the_seed_alike(monkeypatch):
+    monkeypatch.setattr(monte_carlo_risk_simulation, "simulation_cache", SimulationCache())
+    client = monte_carlo_risk_simulation.app.test_client()
+    payload = {**PARAMS, "tribunal_stance": "Neutral", "iterations": 500}
+
+    first = client.post("/simulate", json={**payload, "seed": 7}).json
+    # A seed sent as text is the same seed, and the same cache entry
+    second = client.post("/simulate", json={**payload, "seed": "7"}).json
+    assert second["success"] and second["cached"]
+    assert second["metrics"] == first["metrics"]
+
+    sweep = {**payload, "sweep": [{"factor": "evidence", "values": [20, 80]}]}
+    assert client.post("/sweep", json={**sweep, "seed": "7"}).json == client.post("/sweep", json={**sweep, "seed": 7}).json
+
+    for bad in ("seven", 1.5, -1):
+        assert not client.post("/simulate", json={**payload, "seed": bad}).json["success"]
+    query = "&".join(f"{k}={v}" for k, v in payload.items())
+    assert client.get(f"/simulate/stream?{query}&seed=seven").status_code == 400
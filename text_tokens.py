@@ -0,0 +1,12 @@
+import re
+from typing import List
+
+# Kept free of numpy/scipy so prompt-side code can tokenize without loading the indexes
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]